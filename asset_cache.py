@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+import httpx
+from config import ASSET_CACHE_DIR, ASSET_DOWNLOAD_CONCURRENCY, ASSET_DOWNLOAD_TIMEOUT, ASSET_CACHE_MAX_BYTES, ASSET_EXTERNAL_REVALIDATE_AFTER
+from notion_api import SingleFlight
+from render_cache import EVICT_TARGET_RATIO
+from utils import atomic_write
+
+def image_url(block):
+    image_data = block.get('image', {})
+    return image_data.get('file', {}).get('url') or image_data.get('external', {}).get('url', '')
+
+def collect_image_urls(blocks, urls=None):
+    """블록 트리의 모든 이미지 URL을 순서대로(중복 없이) 모읍니다."""
+    urls = [] if urls is None else urls
+    for block in blocks:
+        if block.get('type') == 'image':
+            url = image_url(block)
+            if url and url not in urls:
+                urls.append(url)
+        collect_image_urls(block.get('children', []), urls)
+    return urls
+
+def is_signed_file_url(url):
+    return 'amazonaws.com' in urlsplit(url).netloc and 'X-Amz-' in urlsplit(url).query
+
+def asset_key(url):
+    """Notion 파일 URL은 만료되는 서명 쿼리를 빼고, 외부 URL은 그대로 해시합니다."""
+    parts = urlsplit(url)
+    if is_signed_file_url(url):
+        url = urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+class AssetCache:
+    """이미지를 미리 내려받아 두고 Playwright 요청 가로채기로 Chromium에 제공합니다.
+
+    이미지마다 본문 파일과 메타데이터(.json)를 두고, 본문 파일의 수정 시각을 마지막 사용 시각으로 씁니다.
+    전체 크기가 max_bytes를 넘으면 RenderCache처럼 가장 오래 사용되지 않은 이미지부터 지웁니다.
+    Notion 파일은 경로가 같으면 내용도 같아 그대로 쓰고, 외부 URL은 받은 지 revalidate_after초가
+    지나면 ETag/Last-Modified 조건부 요청으로 바뀌었는지 확인합니다.
+    """
+
+    def __init__(self, cache_dir=ASSET_CACHE_DIR, concurrency=ASSET_DOWNLOAD_CONCURRENCY, timeout=ASSET_DOWNLOAD_TIMEOUT,
+                 max_bytes=ASSET_CACHE_MAX_BYTES, revalidate_after=ASSET_EXTERNAL_REVALIDATE_AFTER):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.hits = 0
+        self.downloads = 0
+        self.revalidated = 0
+        self.failures = 0
+        self._total_bytes = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight = SingleFlight()
+        self._client = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = asset_key(url)
+        return os.path.join(self.cache_dir, key), os.path.join(self.cache_dir, f"{key}.json")
+
+    def has(self, url):
+        return os.path.exists(self._paths(url)[1])
+
+    async def prefetch(self, urls):
+        """캐시에 없는 URL들을 동시에 내려받습니다. 실패한 URL은 렌더링 시 원래대로 요청됩니다."""
+        await asyncio.gather(*(self._inflight.run(asset_key(url), lambda url=url: self._download(url)) for url in urls))
+
+    def _load_meta(self, data_path, meta_path):
+        """받아 둔 이미지의 메타데이터를 읽습니다. 본문이나 메타데이터가 없으면 None입니다."""
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            os.utime(data_path)
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    def _is_fresh(self, url, meta):
+        if is_signed_file_url(url):
+            return True
+        return time.time() - meta.get('checked_at', 0) < self.revalidate_after
+
+    async def _download(self, url):
+        data_path, meta_path = self._paths(url)
+        meta = self._load_meta(data_path, meta_path)
+        if meta is not None and self._is_fresh(url, meta):
+            self.hits += 1
+            return
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
+        try:
+            async with self._semaphore:
+                response = await self._client.get(url, headers=headers)
+            if response.status_code != 304 or meta is None:
+                response.raise_for_status()
+        except Exception as e:
+            if meta is not None:
+                # 다시 확인하지 못한 외부 이미지는 받아 둔 것을 그대로 씁니다.
+                print(f"이미지 재확인 실패, 받아 둔 파일을 씁니다: {e}")
+                self.hits += 1
+                return
+            self.failures += 1
+            print(f"이미지 다운로드 실패: {e}")
+            return
+        if response.status_code == 304:
+            self._write_meta(meta_path, {**meta, 'checked_at': time.time()})
+            self.revalidated += 1
+            return
+        try:
+            self._store(url, response, data_path, meta_path)
+        except OSError as e:
+            self.failures += 1
+            print(f"이미지 캐시 저장 오류: {e}")
+            return
+        self.downloads += 1
+
+    def _store(self, url, response, data_path, meta_path):
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        try:
+            replaced = os.path.getsize(data_path)
+        except FileNotFoundError:
+            replaced = 0
+        with atomic_write(data_path) as f:
+            f.write(response.content)
+        # 메타데이터 파일은 본문을 다 쓴 뒤에 만들어 has()가 완전한 파일만 보도록 합니다.
+        self._write_meta(meta_path, {
+            'url': url,
+            'content_type': response.headers.get('content-type', 'application/octet-stream'),
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'checked_at': time.time(),
+        })
+        self._total_bytes += len(response.content) - replaced
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _write_meta(self, meta_path, meta):
+        with atomic_write(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            # 본문 파일만 셉니다. 메타데이터(.json)와 다른 실행이 쓰고 있는 임시 파일은 건너뜁니다.
+            if '.' in name:
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * EVICT_TARGET_RATIO:
+                break
+            # 메타데이터를 먼저 지워 has()가 본문 없는 항목을 보지 않게 합니다.
+            for victim in (f"{path}.json", path):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            total -= size
+        self._total_bytes = total
+
+    async def handle_route(self, route):
+        """page/context.route(self.has, self.handle_route)로 등록합니다."""
+        data_path, meta_path = self._paths(route.request.url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            await route.fulfill(path=data_path, content_type=meta['content_type'], status=200)
+        except Exception:
+            await route.continue_()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def summary(self):
+        return (f"이미지 캐시: 재사용 {self.hits} / 다시 확인 {self.revalidated} / "
+                f"다운로드 {self.downloads} / 실패 {self.failures}")
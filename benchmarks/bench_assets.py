@@ -0,0 +1,79 @@
+"""지연이 있는 로컬 이미지 서버를 상대로 이미지 프리페치와 캐시 재사용을 측정합니다.
+
+사용법: python benchmarks/bench_assets.py [--images 40] [--latency 0.2] [--render]
+--render를 주면 Chromium으로 이미지 페이지를 렌더링하여 요청 가로채기 전후를 비교합니다.
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_cache import AssetCache, collect_image_urls
+from fake_notion_server import PNG, LocalHTTPServer
+
+def start_image_server(latency):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            threading.Event().wait(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(PNG)))
+            self.end_headers()
+            self.wfile.write(PNG)
+
+    server = LocalHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_blocks(base_url, count):
+    return [{'type': 'image', 'image': {'type': 'external', 'external': {'url': f"{base_url}/img/{i}.png"}}} for i in range(count)]
+
+async def render(html, asset_cache=None):
+    from browser_pool import BrowserPool
+    from exporter import load_content
+    async with BrowserPool(size=1, asset_cache=asset_cache) as pool:
+        start = time.perf_counter()
+        async with pool.page() as page:
+            await load_content(page, html)
+            await page.pdf(format="A4")
+        return time.perf_counter() - start
+
+async def main(args):
+    server = start_image_server(args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    blocks = make_blocks(base_url, args.images)
+    urls = collect_image_urls(blocks)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        asset_cache = AssetCache(cache_dir)
+        start = time.perf_counter()
+        await asset_cache.prefetch(urls)
+        print(f"프리페치(동시) {len(urls)}개: {time.perf_counter() - start:.2f}s  {asset_cache.summary()}")
+        await asset_cache.close()
+
+        asset_cache = AssetCache(cache_dir)
+        start = time.perf_counter()
+        await asset_cache.prefetch(urls)
+        print(f"두 번째 실행(캐시): {time.perf_counter() - start:.3f}s  {asset_cache.summary()}")
+
+        if args.render:
+            html = ''.join(f"<img src='{url}'>" for url in urls)
+            print(f"렌더링(네트워크): {await render(html):.2f}s")
+            print(f"렌더링(가로채기): {await render(html, asset_cache):.2f}s")
+        await asset_cache.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--render', action='store_true')
+    asyncio.run(main(parser.parse_args()))
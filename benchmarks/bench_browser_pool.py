@@ -0,0 +1,56 @@
+"""페이지마다 브라우저를 새로 띄우는 방식과 BrowserPool 방식의 렌더링 지연을 비교합니다.
+
+사용법: python benchmarks/bench_browser_pool.py [페이지 수]
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_pool import BrowserPool
+from config import EXPORT_CONCURRENCY
+from exporter import render_pdf
+
+SAMPLE_HTML = """
+<!DOCTYPE html>
+<html lang="ko"><head><meta charset="UTF-8"></head>
+<body><h1>Benchmark {index}</h1>{body}</body></html>
+"""
+
+def make_html(index):
+    body = ''.join(f"<p>문단 {i} - 샘플 텍스트입니다.</p>" for i in range(50))
+    return SAMPLE_HTML.format(index=index, body=body)
+
+async def run(page_count, browser_pool=None):
+    semaphore = asyncio.Semaphore(EXPORT_CONCURRENCY)
+    latencies = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        async def render_one(idx):
+            async with semaphore:
+                start = time.perf_counter()
+                await render_pdf(make_html(idx), os.path.join(temp_dir, f"{idx}.pdf"), browser_pool)
+                latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        await asyncio.gather(*(render_one(i) for i in range(page_count)))
+        total = time.perf_counter() - start
+    return total, latencies
+
+def report(name, total, latencies):
+    latencies = sorted(latencies)
+    mean = sum(latencies) / len(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<12} 총 {total:6.2f}s | 페이지당 평균 {mean * 1000:7.1f}ms | p95 {p95 * 1000:7.1f}ms")
+
+async def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    total, latencies = await run(page_count)
+    report("cold-launch", total, latencies)
+    async with BrowserPool() as browser_pool:
+        total, latencies = await run(page_count, browser_pool)
+    report("pool", total, latencies)
+
+if __name__ == "__main__":
+    asyncio.run(main())
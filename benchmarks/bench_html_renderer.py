@@ -0,0 +1,237 @@
+"""html_renderer.render_blocks와 기존 async blocks_to_html 구현의 속도를 비교합니다.
+
+사용법: python benchmarks/bench_html_renderer.py [블록 수]
+두 구현의 출력이 같은지도 함께 확인합니다.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_renderer import render_blocks, NOTION_COLOR_MAP, NOTION_BG_MAP
+
+# ---- 기존 구현 (비교용, 변경 전 exporter.py에서 그대로 복사) ----
+
+def legacy_rich_text_to_html(rich_text_array, process_nested_bullets=False):
+    if not rich_text_array:
+        return ""
+    html = ""
+    for chunk in rich_text_array:
+        href = chunk.get("href")
+        text = chunk.get('plain_text', '').replace('\n', '<br>')
+        if href:
+            html += f'<a href="{href}" target="_blank">{text}</a>'
+        else:
+            html += legacy_apply_annotations(text, chunk)
+    return html
+
+def legacy_apply_annotations(text, chunk):
+    if not text:
+        return ""
+    href = chunk.get('href')
+    if href:
+        return f'<a href="{href}">{text}</a>'
+    annotations = chunk.get('annotations', {})
+    if annotations.get('bold'): text = f'<strong>{text}</strong>'
+    if annotations.get('italic'): text = f'<em>{text}</em>'
+    if annotations.get('underline'): text = f'<u>{text}</u>'
+    if annotations.get('strikethrough'): text = f'<s>{text}</s>'
+    if annotations.get('code'): text = f'<code>{text}</code>'
+    return text
+
+def legacy_get_cell_style(cell, row_bg=None):
+    if not cell:
+        return ""
+    first = cell[0] if cell else {}
+    annotations = first.get('annotations', {})
+    color = annotations.get('color', 'default')
+    font_weight = 'bold' if annotations.get('bold') else 'normal'
+    font_style = 'italic' if annotations.get('italic') else 'normal'
+    text_color = NOTION_COLOR_MAP.get(color.replace('_background', ''), '#000')
+    if 'background' in color:
+        bg_color = NOTION_BG_MAP.get(color, '#fff')
+    elif row_bg and row_bg != 'default':
+        bg_color = NOTION_BG_MAP.get(row_bg, '#fff')
+    else:
+        bg_color = '#fff'
+    style = f"color:{text_color};background:{bg_color};font-weight:{font_weight};font-style:{font_style};"
+    return style
+
+def legacy_get_plain_text_from_cell(cell):
+    return ''.join([t.get('plain_text', '') for t in cell])
+
+def legacy_estimate_column_widths_with_pixel_heuristic(table_rows):
+    if not table_rows:
+        return []
+    col_lengths = []
+    max_cols = max(len(row['table_row']['cells']) for row in table_rows) if table_rows else 0
+    if max_cols == 0: return []
+    for col_idx in range(max_cols):
+        max_length = 0
+        for row in table_rows:
+            cells = row['table_row']['cells']
+            if col_idx < len(cells):
+                cell_text = legacy_get_plain_text_from_cell(cells[col_idx])
+                line_lengths = [len(line) for line in cell_text.split('\n')]
+                cell_length = max(line_lengths) if line_lengths else 0
+                max_length = max(max_length, cell_length)
+        col_lengths.append(max_length)
+    total_content_length = sum(col_lengths)
+    if total_content_length == 0:
+        return [100 / max_cols] * max_cols if max_cols > 0 else []
+    PIXEL_PER_CHAR = 4
+    MIN_COL_WIDTH_PX = 65
+    estimated_px_widths = [max(MIN_COL_WIDTH_PX, length * PIXEL_PER_CHAR) for length in col_lengths]
+    total_estimated_px_width = sum(estimated_px_widths)
+    if total_estimated_px_width == 0: return [100 / max_cols] * max_cols if max_cols > 0 else []
+    percent_widths = [(px_width / total_estimated_px_width) * 100 for px_width in estimated_px_widths]
+    wrap_cols = set()
+    for col_idx in range(max_cols):
+        for row in table_rows:
+            cells = row['table_row']['cells']
+            if col_idx < len(cells):
+                cell_text = legacy_get_plain_text_from_cell(cells[col_idx])
+                if '\n' in cell_text:
+                    wrap_cols.add(col_idx)
+    current_sum = sum(percent_widths)
+    remain = 100 - current_sum
+    if remain > 0 and wrap_cols:
+        add_per_col = remain / len(wrap_cols)
+        for idx in wrap_cols:
+            percent_widths[idx] += add_per_col
+    current_sum2 = sum(percent_widths)
+    if current_sum2 != 100 and percent_widths:
+        diff = 100 - current_sum2
+        percent_widths[0] += diff
+    return percent_widths
+
+async def legacy_blocks_to_html(blocks, notion_client):
+    if not blocks:
+        return ""
+    html_parts = []
+    i = 0
+    while i < len(blocks):
+        block = blocks[i]
+        block_type = block['type']
+        if block_type == 'synced_block':
+            synced_children = block.get('children')
+            synced_block_content = await legacy_blocks_to_html(synced_children, notion_client) if synced_children else ""
+            html_parts.append(f"<div class='synced-block-container'>{synced_block_content}</div>")
+            i += 1
+            continue
+        if block_type in ['bulleted_list_item', 'numbered_list_item']:
+            list_tag = 'ul' if block_type == 'bulleted_list_item' else 'ol'
+            list_items = []
+            j = i
+            while j < len(blocks) and blocks[j]['type'] == block_type:
+                current_block = blocks[j]
+                item_content = legacy_rich_text_to_html(current_block[block_type]['rich_text'])
+                if current_block.get('has_children') and current_block.get('children'):
+                    item_content += await legacy_blocks_to_html(current_block['children'], notion_client)
+                list_items.append(f"<li>{item_content}</li>")
+                j += 1
+            html_parts.append(f"<{list_tag}>{''.join(list_items)}</{list_tag}>")
+            i = j
+            continue
+        block_html = ""
+        if block_type == 'heading_1':
+            block_html = f"<h1>{legacy_rich_text_to_html(block['heading_1']['rich_text'])}</h1>"
+        elif block_type == 'heading_2':
+            block_html = f"<h2>{legacy_rich_text_to_html(block['heading_2']['rich_text'])}</h2>"
+        elif block_type == 'heading_3':
+            block_html = f"<h3>{legacy_rich_text_to_html(block['heading_3']['rich_text'])}</h3>"
+        elif block_type == 'paragraph':
+            text = legacy_rich_text_to_html(block['paragraph']['rich_text'])
+            block_html = f"<p>{text if text.strip() else ' '}</p>"
+            if block.get('has_children') and block.get('children'):
+                block_html += f"<div style='margin-left: 2em;'>{await legacy_blocks_to_html(block['children'], notion_client)}</div>"
+        elif block_type == 'image':
+            image_data = block['image']
+            url = image_data.get('file', {}).get('url') or image_data.get('external', {}).get('url', '')
+            block_html = f"<img src='{url}' alt='Image' class='notion-block-image' style='max-width: 100%; height: auto;'>"
+        elif block_type == 'code':
+            code_text = legacy_rich_text_to_html(block['code']['rich_text'])
+            language = block['code'].get('language', '')
+            block_html = f"<pre><code class='language-{language}'>{code_text}</code></pre>"
+        elif block_type == 'divider':
+            block_html = "<hr>"
+        elif block_type == 'quote':
+            block_html = f"<blockquote>{legacy_rich_text_to_html(block['quote']['rich_text'])}</blockquote>"
+        elif block_type == 'toggle':
+            summary = legacy_rich_text_to_html(block['toggle']['rich_text'])
+            children_html = await legacy_blocks_to_html(block['children'], notion_client) if block.get('has_children') and block.get('children') else ""
+            block_html = f"<details open><summary>{summary}</summary>{children_html}</details>"
+        elif block_type == 'table':
+            width_ratios = legacy_estimate_column_widths_with_pixel_heuristic(block.get('children', []))
+            colgroup_html = ''.join([f'<col style="width:{ratio:.2f}%">' for ratio in width_ratios]) if width_ratios else ""
+            table_html_content = f"<table><colgroup>{colgroup_html}</colgroup>"
+            if block.get('children'):
+                for i_row, row_block in enumerate(block['children']):
+                    if row_block['type'] == 'table_row':
+                        cells = row_block['table_row']['cells']
+                        row_bg = row_block['table_row'].get('background', 'default')
+                        table_html_content += f"<tr style='background:{NOTION_BG_MAP.get(row_bg, '#fff')}'>"
+                        for col_idx, cell in enumerate(cells):
+                            style = legacy_get_cell_style(cell, row_bg=row_bg)
+                            tag = 'th' if (block['table'].get('has_column_header') and i_row == 0) or (block['table'].get('has_row_header') and col_idx == 0) else 'td'
+                            if tag == 'th':
+                                table_html_content += f"<th class='table-header-cell' style='{style}'>{legacy_rich_text_to_html(cell)}</th>"
+                            else:
+                                table_html_content += f"<td style='{style}'>{legacy_rich_text_to_html(cell)}</td>"
+                        table_html_content += "</tr>"
+            table_html_content += "</table>"
+            block_html = table_html_content
+        elif block_type == 'callout':
+            callout = block['callout']
+            icon_html = f"{callout['icon']['emoji']} " if callout.get('icon') and callout['icon']['type'] == 'emoji' else ""
+            callout_text = legacy_rich_text_to_html(callout['rich_text'])
+            children_html = await legacy_blocks_to_html(block['children'], notion_client) if block.get('has_children') else ''
+            block_html = f"<div class='callout'>{icon_html}{callout_text}{children_html}</div>"
+        html_parts.append(block_html)
+        i += 1
+    return '\n'.join(html_parts)
+
+# ---- 비교용 기존 구현 끝 ----
+
+def text(value, **annotations):
+    return [{'plain_text': value, 'href': None, 'annotations': annotations}]
+
+def make_blocks(count, seed=0):
+    rng = random.Random(seed)
+    blocks = []
+    while len(blocks) < count:
+        kind = rng.choice(['paragraph', 'heading_2', 'bulleted_list_item', 'numbered_list_item', 'toggle', 'code', 'quote', 'table', 'callout'])
+        i = len(blocks)
+        if kind == 'table':
+            rows = [{'type': 'table_row', 'table_row': {'cells': [text(f"셀 {r}-{c}\n둘째 줄" if c == 1 else f"셀 {r}-{c}", bold=r == 0) for c in range(5)]}} for r in range(50)]
+            blocks.append({'type': 'table', 'table': {'has_column_header': True}, 'has_children': True, 'children': rows})
+        elif kind == 'toggle':
+            children = [{'type': 'paragraph', 'paragraph': {'rich_text': text(f"토글 내부 {j}", italic=True)}} for j in range(5)]
+            blocks.append({'type': 'toggle', 'toggle': {'rich_text': text(f"토글 {i}")}, 'has_children': True, 'children': children})
+        elif kind == 'callout':
+            blocks.append({'type': 'callout', 'callout': {'rich_text': text(f"콜아웃 {i}"), 'icon': {'type': 'emoji', 'emoji': '💡'}}, 'has_children': False})
+        elif kind == 'code':
+            blocks.append({'type': 'code', 'code': {'rich_text': text(f"print({i})"), 'language': 'python'}})
+        else:
+            blocks.append({'type': kind, kind: {'rich_text': text(f"{kind} 블록 {i} " * 5, bold=i % 3 == 0)}, 'has_children': False})
+    return blocks
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    blocks = make_blocks(count)
+
+    start = time.perf_counter()
+    legacy_html = asyncio.run(legacy_blocks_to_html(blocks, None))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    html = render_blocks(blocks)
+    new_time = time.perf_counter() - start
+
+    print(f"블록 {count}개 | 기존 {legacy_time * 1000:8.1f}ms | 새 렌더러 {new_time * 1000:8.1f}ms | 출력 동일: {html == legacy_html}")
+
+if __name__ == "__main__":
+    main()
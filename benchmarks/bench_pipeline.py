@@ -0,0 +1,52 @@
+"""페이지 전체를 Semaphore 하나로 묶은 방식과 단계별 파이프라인의 처리 시간을 비교합니다.
+
+가져오기는 요청 한도에 묶인 I/O, 렌더링은 동시 실행 수가 정해진 작업으로 흉내 냅니다.
+사용법: python benchmarks/bench_pipeline.py [페이지 수]
+"""
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EXPORT_CONCURRENCY, EXPORT_FETCH_WORKERS, EXPORT_RENDER_WORKERS
+from pipeline import StagedPipeline
+
+FETCH_SECONDS = 0.3
+RENDER_SECONDS = 0.2
+
+async def fetch(page_id, idx):
+    await asyncio.sleep(FETCH_SECONDS)
+    return page_id
+
+def make_render(browser_tabs):
+    async def render(page_id, idx):
+        async with browser_tabs:
+            await asyncio.sleep(RENDER_SECONDS)
+        return page_id
+    return render
+
+async def semaphore_per_page(page_ids):
+    semaphore = asyncio.Semaphore(EXPORT_CONCURRENCY)
+    render = make_render(asyncio.Semaphore(EXPORT_CONCURRENCY))
+    async def export(page_id, idx):
+        async with semaphore:
+            return await render(await fetch(page_id, idx), idx)
+    return await asyncio.gather(*(export(page_id, idx) for idx, page_id in enumerate(page_ids)))
+
+async def staged(page_ids):
+    render = make_render(asyncio.Semaphore(EXPORT_RENDER_WORKERS))
+    stages = [('fetch', EXPORT_FETCH_WORKERS, fetch), ('render', EXPORT_RENDER_WORKERS, render)]
+    return await StagedPipeline(stages).run(page_ids)
+
+async def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    page_ids = [f"page-{i}" for i in range(page_count)]
+    for name, func in [("semaphore", semaphore_per_page), ("pipeline", staged)]:
+        start = time.perf_counter()
+        await func(page_ids)
+        print(f"{name:<10} {time.perf_counter() - start:6.2f}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
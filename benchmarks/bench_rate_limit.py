@@ -0,0 +1,70 @@
+"""429/5xx를 섞어 보내는 로컬 서버를 상대로 요청 스케줄러의 재시도와 처리량을 확인합니다.
+
+사용법: python benchmarks/bench_rate_limit.py [--rate-limit-ratio 0.1] [--error-ratio 0.05]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_notion_server import FakeWorkspace, FakeNotionServer, rich_text
+
+def make_workspace(pages, blocks_per_page, depth):
+    ws = FakeWorkspace()
+    counter = 0
+    for p in range(pages):
+        page_id = f'page-{p}'
+        ws.add_page(page_id, f'Page {p}')
+        frontier = [page_id]
+        for _ in range(depth):
+            next_frontier = []
+            for parent_id in frontier:
+                for _ in range(blocks_per_page):
+                    counter += 1
+                    block = ws.add_block(parent_id, {'id': f'block-{counter}', 'type': 'toggle', 'toggle': {'rich_text': rich_text(f'block {counter}')}})
+                    next_frontier.append(block['id'])
+            frontier = next_frontier
+    return ws
+
+def count_blocks(blocks):
+    return sum(1 + count_blocks(b.get('children', [])) for b in blocks)
+
+async def run(args, base_url):
+    os.environ['NOTION_BASE_URL'] = base_url
+    os.environ.setdefault('NOTION_API_KEY', 'fake')
+    from notion_api import create_notion_client, fetch_all_child_blocks
+    from scheduler import RequestScheduler
+    notion = create_notion_client()
+    notion.scheduler = RequestScheduler(rate=args.rate, burst=args.burst)
+    start = time.perf_counter()
+    trees = await asyncio.gather(*(fetch_all_child_blocks(notion, f'page-{p}') for p in range(args.pages)))
+    elapsed = time.perf_counter() - start
+    return notion, trees, elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--blocks', type=int, default=3)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--rate', type=float, default=30.0)
+    parser.add_argument('--burst', type=int, default=10)
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.1)
+    parser.add_argument('--error-ratio', type=float, default=0.05)
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+
+    ws = make_workspace(args.pages, args.blocks, args.depth)
+    with FakeNotionServer(ws, args.rate_limit_ratio, args.error_ratio, args.retry_after) as server:
+        notion, trees, elapsed = asyncio.run(run(args, server.base_url))
+    expected = sum(len(ids) for key, ids in ws.children.items() if key.startswith('page-') or key in ws.blocks)
+    fetched = sum(count_blocks(tree) for tree in trees)
+    print(f"서버 요청 {server.request_count}회 (429 {server.rate_limited_count}, 5xx {server.error_count})")
+    print(f"클라이언트 요청 {notion.request_count}회, 재시도 {notion.retry_count}회, 소요 {elapsed:.2f}s")
+    print(f"블록 {fetched}/{expected} 수신 {'(완전)' if fetched == expected else '(누락 있음)'}")
+    return 0 if fetched == expected else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""하위 블록을 가져오지 못한 페이지가 있는 내보내기를 이어서 할 때 그 페이지만 다시 처리하는지 확인합니다.
+
+가짜 Notion 서버에서 한 페이지의 하위 블록 조회가 계속 502를 내게 한 뒤 resume=True로 내보내고,
+서버를 되살린 다음 같은 옵션으로 다시 실행합니다. 렌더링은 Chromium 없이 돌도록 빈 쪽 하나짜리 PDF를 만드는 대역을 씁니다.
+사용법: python benchmarks/bench_resume.py [페이지 수]
+"""
+import io
+import os
+import sys
+import asyncio
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_notion_server import FakeNotionServer, generate_workspace
+
+class BlankPagePool:
+    """BrowserPool 대신 쓰는 렌더러입니다. 렌더링한 횟수를 셉니다."""
+
+    renders = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def start(self):
+        return self
+
+    async def close(self):
+        pass
+
+    async def render(self, full_html):
+        from PyPDF2 import PdfWriter
+        BlankPagePool.renders += 1
+        writer = PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+async def export(ids, output_path):
+    import exporter
+    from notion_api import create_notion_client
+    notion = create_notion_client()
+    # 서버 장애가 재시도로 풀리지 않는 상황을 바로 만들기 위해 재시도를 끕니다.
+    notion.max_retries = 0
+    return await exporter.export_and_merge_pdf(ids, output_path, notion_client=notion, resume=True)
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    # .etc/ 아래 캐시와 체크포인트가 이전 실행의 영향을 받지 않도록 빈 디렉터리에서 돕니다.
+    os.chdir(tempfile.mkdtemp(prefix='bench-resume-'))
+    import exporter
+    from checkpoint import ExportCheckpoint
+    from PyPDF2 import PdfReader
+    exporter.BrowserPool = BlankPagePool
+    exporter.EXPORT_PAGE_RETRIES = 0
+
+    with FakeNotionServer() as server:
+        server.workspace = generate_workspace(server.base_url, page_count, depth=2, fanout=3)
+        os.environ['NOTION_BASE_URL'] = server.base_url
+        os.environ.setdefault('NOTION_API_KEY', 'fake')
+        ids = [f"page-{p:05d}" for p in range(page_count)]
+        broken = ids[page_count // 2]
+        output_path = os.path.abspath('out.pdf')
+
+        server.failing_children.add(broken)
+        try:
+            asyncio.run(export(ids, output_path))
+            print("첫 실행이 실패하지 않았습니다")
+            return 1
+        except exporter.PageExportError as e:
+            failed = set(e.failures)
+        checkpoint = ExportCheckpoint(output_path, ids).open()
+        checkpoint.close()
+        recorded = broken in checkpoint.fetched or broken in checkpoint.rendered
+        first_renders = BlankPagePool.renders
+
+        server.failing_children.clear()
+        BlankPagePool.renders = 0
+        asyncio.run(export(ids, output_path))
+        pages = len(PdfReader(output_path).pages)
+
+    print(f"첫 실행: 실패 {sorted(failed)}, 렌더링 {first_renders}회, 실패한 페이지 체크포인트 기록 {'있음' if recorded else '없음'}")
+    print(f"이어서 실행: 렌더링 {BlankPagePool.renders}회, 최종 PDF {pages}/{page_count}쪽, 체크포인트 {'남음' if os.path.exists(checkpoint.run_dir) else '지움'}")
+    ok = (failed == {broken} and not recorded and BlankPagePool.renders == 1
+          and pages == page_count and not os.path.exists(checkpoint.run_dir))
+    print("통과" if ok else "실패")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""페이지별 렌더링 + PdfMerger 병합과 단일 문서 한 번 렌더링의 소요 시간을 비교합니다.
+
+사용법: python benchmarks/bench_single_document.py [페이지 수]
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_pool import BrowserPool
+from config import EXPORT_CONCURRENCY
+from exporter import render_page_pdf, build_single_document, render_pdf, merge_pdfs
+
+def make_contents(page_count):
+    contents = []
+    for i in range(page_count):
+        paragraphs = ''.join(f"<p>페이지 {i}의 문단 {j} - 샘플 텍스트입니다.</p>" for j in range(40))
+        contents.append((f"Page {i}", f"<h1>Page {i}</h1>{paragraphs}"))
+    return contents
+
+async def per_page(contents, temp_dir, browser_pool):
+    semaphore = asyncio.Semaphore(EXPORT_CONCURRENCY)
+    async def render(content, idx):
+        async with semaphore:
+            return await render_page_pdf(content[0], content[1], idx, browser_pool)
+    pdfs = await asyncio.gather(*(render(content, idx) for idx, content in enumerate(contents)))
+    return merge_pdfs(pdfs, os.path.join(temp_dir, 'per_page.pdf'))
+
+async def single_document(contents, temp_dir, browser_pool):
+    return await render_pdf(build_single_document(contents), os.path.join(temp_dir, 'single.pdf'), browser_pool)
+
+async def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    contents = make_contents(page_count)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        async with BrowserPool() as browser_pool:
+            for name, func in [("per-page+merge", per_page), ("single-document", single_document)]:
+                start = time.perf_counter()
+                path = await func(contents, temp_dir, browser_pool)
+                elapsed = time.perf_counter() - start
+                print(f"{name:<16} {elapsed:6.2f}s  ({os.path.getsize(path) / 1024:.0f}KB)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""GUI/CLI 진입 모듈의 import 시간과 창이 뜨기까지의 시간을 재고, 무거운 모듈이 미리 로드되지 않는지 확인합니다.
+
+사용법: python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 400] [--window-budget-ms 1500] [--output startup.json]
+python -X importtime 출력에서 모듈별 누적 시간을 읽습니다. 내보내기 전에는 필요 없는 모듈
+(playwright, PyPDF2 등)이 로드되거나, import 시간이나 창 표시 시간이 예산을 넘으면 종료 코드 1로 끝나 회귀를 막습니다.
+PySide6가 없는 환경에서는 GUI 모듈 항목을 건너뜁니다.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 진입 모듈 -> import 시점에 로드되면 안 되는 최상위 패키지
+ENTRY_MODULES = {
+    'main': {'playwright', 'PyPDF2', 'notion_client', 'httpx', 'exporter', 'notion_api'},
+    'main_adv': {'playwright', 'PyPDF2', 'notion_client', 'httpx', 'exporter', 'notion_api'},
+    'cli': {'playwright', 'PyPDF2', 'exporter'},
+}
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# 창을 띄운 직후 바로 종료합니다. 작업 스레드가 네트워크를 쓰지 않도록 존재하지 않는 주소를 씁니다.
+WINDOW_SCRIPT = """
+import os, sys
+os.environ.setdefault('NOTION_BASE_URL', 'http://127.0.0.1:9')
+from PySide6.QtWidgets import QApplication
+import {module} as entry
+app = QApplication(sys.argv)
+window = getattr(entry, {window_class!r})()
+window.show()
+app.processEvents()
+print('shown', flush=True)
+os._exit(0)
+"""
+
+def measure_import(module):
+    """(누적 import 시간 ms, 로드된 최상위 패키지 집합, 오류 메시지)를 반환합니다."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT, capture_output=True, text=True)
+    total_us = None
+    packages = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        packages.add(name.split('.')[0])
+        if name == module and len(match.group(3)) == 1:
+            total_us = int(match.group(2))
+    if proc.returncode != 0:
+        return None, packages, proc.stderr.strip().splitlines()[-1]
+    return total_us / 1000 if total_us is not None else None, packages, None
+
+def measure_window(module, window_class):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', WINDOW_SCRIPT.format(module=module, window_class=window_class)],
+                          cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0 or 'shown' not in proc.stdout:
+        return None, (proc.stderr.strip().splitlines() or ['unknown error'])[-1]
+    return elapsed, None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=400.0, help="진입 모듈 import 누적 시간 예산 (중앙값)")
+    parser.add_argument('--window-budget-ms', type=float, default=1500.0, help="창이 뜨기까지의 시간 예산 (프로세스 시작 포함)")
+    parser.add_argument('--output', help="결과 JSON 경로 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    windows = {'main': 'MainWindow', 'main_adv': 'MainWindowAdv'}
+    for module, forbidden in ENTRY_MODULES.items():
+        timings = []
+        loaded = set()
+        error = None
+        for _ in range(args.repeat):
+            ms, packages, error = measure_import(module)
+            if error:
+                break
+            timings.append(ms)
+            loaded |= packages
+        if error:
+            results[module] = {'skipped': error}
+            print(f"{module:<10} 건너뜀: {error}", file=sys.stderr)
+            continue
+        eager = sorted(loaded & forbidden)
+        result = {'import_ms': statistics.median(timings), 'runs_ms': timings, 'eager_heavy_modules': eager}
+        if module in windows:
+            window_ms, window_error = measure_window(module, windows[module])
+            result['time_to_window_ms'] = window_ms if window_error is None else None
+            if window_error:
+                result['window_error'] = window_error
+        results[module] = result
+        print(f"{module:<10} import 중앙값 {result['import_ms']:.1f}ms"
+              + (f", 창 표시 {result['time_to_window_ms']:.0f}ms" if result.get('time_to_window_ms') else '')
+              + (f", 미리 로드됨: {', '.join(eager)}" if eager else ''), file=sys.stderr)
+        if eager:
+            failures.append(f"{module}: {', '.join(eager)} 모듈이 시작 시 로드됩니다.")
+        if result['import_ms'] > args.budget_ms:
+            failures.append(f"{module}: import {result['import_ms']:.1f}ms > 예산 {args.budget_ms:.0f}ms")
+        if result.get('window_error'):
+            failures.append(f"{module}: 창을 띄우지 못했습니다: {result['window_error']}")
+        elif result.get('time_to_window_ms') and result['time_to_window_ms'] > args.window_budget_ms:
+            failures.append(f"{module}: 창 표시 {result['time_to_window_ms']:.0f}ms > 예산 {args.window_budget_ms:.0f}ms")
+
+    output = json.dumps({'python': sys.version.split()[0], 'budget_ms': args.budget_ms,
+                         'window_budget_ms': args.window_budget_ms, 'modules': results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""표 열 너비 계산(estimate_column_widths_with_pixel_heuristic)의 기존/단일 패스 구현을 비교합니다.
+
+사용법: python benchmarks/bench_table_layout.py [행 수] [열 수]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_renderer import estimate_column_widths_with_pixel_heuristic
+
+def legacy_get_plain_text_from_cell(cell):
+    return ''.join([t.get('plain_text', '') for t in cell])
+
+def legacy_estimate_column_widths(table_rows):
+    """변경 전 구현 (열마다 모든 행을 두 번 훑음)."""
+    if not table_rows:
+        return []
+    col_lengths = []
+    max_cols = max(len(row['table_row']['cells']) for row in table_rows) if table_rows else 0
+    if max_cols == 0: return []
+    for col_idx in range(max_cols):
+        max_length = 0
+        for row in table_rows:
+            cells = row['table_row']['cells']
+            if col_idx < len(cells):
+                cell_text = legacy_get_plain_text_from_cell(cells[col_idx])
+                line_lengths = [len(line) for line in cell_text.split('\n')]
+                cell_length = max(line_lengths) if line_lengths else 0
+                max_length = max(max_length, cell_length)
+        col_lengths.append(max_length)
+    total_content_length = sum(col_lengths)
+    if total_content_length == 0:
+        return [100 / max_cols] * max_cols if max_cols > 0 else []
+    estimated_px_widths = [max(65, length * 4) for length in col_lengths]
+    total_estimated_px_width = sum(estimated_px_widths)
+    percent_widths = [(px_width / total_estimated_px_width) * 100 for px_width in estimated_px_widths]
+    wrap_cols = set()
+    for col_idx in range(max_cols):
+        for row in table_rows:
+            cells = row['table_row']['cells']
+            if col_idx < len(cells):
+                cell_text = legacy_get_plain_text_from_cell(cells[col_idx])
+                if '\n' in cell_text:
+                    wrap_cols.add(col_idx)
+    remain = 100 - sum(percent_widths)
+    if remain > 0 and wrap_cols:
+        add_per_col = remain / len(wrap_cols)
+        for idx in wrap_cols:
+            percent_widths[idx] += add_per_col
+    current_sum2 = sum(percent_widths)
+    if current_sum2 != 100 and percent_widths:
+        percent_widths[0] += 100 - current_sum2
+    return percent_widths
+
+def make_rows(row_count, col_count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for r in range(row_count):
+        cells = []
+        for c in range(col_count):
+            words = ' '.join(rng.choice(['Python', 'Qt', 'Notion', 'PDF', '자동화', '백엔드']) for _ in range(rng.randint(1, 6)))
+            if rng.random() < 0.1:
+                words += '\n' + words
+            cells.append([{'plain_text': part} for part in words.split(' ')])
+        rows.append({'type': 'table_row', 'table_row': {'cells': cells}})
+    return rows
+
+def timed(func, rows, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(rows)
+    return result, (time.perf_counter() - start) / repeat
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    col_count = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    rows = make_rows(row_count, col_count)
+    legacy, legacy_time = timed(legacy_estimate_column_widths, rows)
+    new, new_time = timed(estimate_column_widths_with_pixel_heuristic, rows)
+    same = [f"{w:.2f}" for w in legacy] == [f"{w:.2f}" for w in new]
+    print(f"{row_count}x{col_count} 표 | 기존 {legacy_time * 1000:7.2f}ms | 단일 패스 {new_time * 1000:7.2f}ms | 결과 동일: {same}")
+
+if __name__ == "__main__":
+    main()
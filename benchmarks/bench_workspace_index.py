@@ -0,0 +1,85 @@
+"""WorkspaceIndex와 기존 리스트 스캔 방식의 루트/하위 페이지 계산 시간을 비교합니다.
+
+사용법: python benchmarks/bench_workspace_index.py [--legacy-max 10000]
+기존 방식은 O(n^2)이라 legacy-max보다 큰 워크스페이스에서는 건너뜁니다.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workspace_index import WorkspaceIndex
+
+def make_workspace(page_count, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    for i in range(page_count):
+        if i < max(1, page_count // 100) or rng.random() < 0.05:
+            parent = {'type': 'workspace', 'workspace': True}
+        elif rng.random() < 0.1:
+            parent = {'type': 'database_id', 'database_id': f'db-{rng.randrange(10)}'}
+        else:
+            parent = {'type': 'page_id', 'page_id': f'page-{rng.randrange(i)}'}
+        pages.append({
+            'id': f'page-{i}',
+            'parent': parent,
+            'properties': {'title': {'type': 'title', 'title': [{'plain_text': f'Page {i}'}]}},
+        })
+    rng.shuffle(pages)
+    return pages
+
+def legacy_root_pages(all_pages):
+    root_pages = []
+    for page in all_pages:
+        parent = page.get("parent", {})
+        parent_type = parent.get("type", "")
+        if parent_type != "database_id" and not (parent_type == "page_id" and parent.get("page_id") in [p['id'] for p in all_pages]):
+            root_pages.append(page)
+    return root_pages
+
+def legacy_descendant_ids(page_id, all_pages):
+    ids = [page_id]
+    children = [p for p in all_pages if p.get("parent", {}).get("type") == "page_id" and p.get("parent", {}).get("page_id") == page_id]
+    for child in children:
+        ids.extend(legacy_descendant_ids(child['id'], all_pages))
+    return ids
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--legacy-max', type=int, default=10000)
+    args = parser.parse_args()
+    sys.setrecursionlimit(100000)
+
+    for size in args.sizes:
+        pages = make_workspace(size)
+        index, build_time = timed(WorkspaceIndex, pages)
+        roots, root_time = timed(index.root_pages)
+        start = time.perf_counter()
+        descendant_total = sum(len(index.descendant_ids(page_id)) for page_id in index.roots)
+        desc_time = time.perf_counter() - start
+        line = (f"{size:>6} pages | index build {build_time * 1000:8.2f}ms, roots {root_time * 1000:7.2f}ms, "
+                f"descendants of all roots {desc_time * 1000:8.2f}ms")
+        if size <= args.legacy_max:
+            legacy_roots, legacy_root_time = timed(legacy_root_pages, pages)
+            assert [p['id'] for p in legacy_roots] == [p['id'] for p in roots]
+            sample = index.roots[:20]
+            start = time.perf_counter()
+            for page_id in sample:
+                assert legacy_descendant_ids(page_id, pages) == index.descendant_ids(page_id)
+            legacy_desc_time = time.perf_counter() - start
+            line += (f" || legacy roots {legacy_root_time * 1000:9.2f}ms, "
+                     f"descendants of {len(sample)} roots {legacy_desc_time * 1000:9.2f}ms")
+        print(line)
+        assert descendant_total <= size
+
+if __name__ == "__main__":
+    main()
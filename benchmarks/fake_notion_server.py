@@ -0,0 +1,228 @@
+"""테스트/벤치마크용 로컬 Notion API 대역 서버입니다.
+
+search, pages.retrieve, blocks.retrieve, blocks.children.list만 구현하며,
+지정한 비율로 429(Retry-After 포함)나 5xx 응답을 섞어 보낼 수 있고,
+failing_children에 넣은 블록/페이지의 하위 블록 조회는 뺄 때까지 계속 502로 응답합니다.
+generate_workspace로 만든 워크스페이스의 이미지는 같은 서버의 /assets/ 경로에서 제공됩니다.
+클라이언트는 NOTION_BASE_URL=http://127.0.0.1:<port> 로 이 서버를 사용합니다.
+"""
+import json
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+def rich_text(text):
+    return [{'type': 'text', 'plain_text': text, 'href': None, 'annotations': {}}]
+
+class FakeWorkspace:
+    """페이지/블록을 메모리에 들고 있는 가짜 워크스페이스입니다."""
+
+    def __init__(self):
+        self.pages = {}
+        self.blocks = {}
+        self.children = {}
+
+    def add_page(self, page_id, title, parent=None, last_edited_time='2024-01-01T00:00:00.000Z'):
+        parent = parent or {'type': 'workspace', 'workspace': True}
+        self.pages[page_id] = {
+            'object': 'page', 'id': page_id, 'parent': parent, 'last_edited_time': last_edited_time,
+            'properties': {'title': {'type': 'title', 'title': rich_text(title)}},
+        }
+        self.children.setdefault(page_id, [])
+        if parent.get('type') == 'page_id':
+            self.add_block(parent['page_id'], {'type': 'child_page', 'id': page_id, 'child_page': {'title': title}})
+        return self.pages[page_id]
+
+    def add_block(self, parent_id, block):
+        block.setdefault('object', 'block')
+        block.setdefault('has_children', False)
+        block.setdefault('last_edited_time', '2024-01-01T00:00:00.000Z')
+        parent_type = 'page_id' if parent_id in self.pages else 'block_id'
+        block['parent'] = {'type': parent_type, parent_type: parent_id}
+        self.blocks[block['id']] = block
+        self.children.setdefault(parent_id, []).append(block['id'])
+        if parent_id in self.blocks:
+            self.blocks[parent_id]['has_children'] = True
+        return block
+
+# 1x1 PNG
+PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082'
+)
+
+def generate_workspace(base_url, pages=20, depth=2, fanout=4, table_rows=0, table_cols=4,
+                       synced_reuse=0, images=0, seed=0):
+    """벤치마크용 워크스페이스를 만듭니다.
+
+    루트 페이지 'Portfolio' 아래에 pages개의 하위 페이지가 있고, 각 페이지는
+    깊이 depth, 가지 수 fanout의 블록 트리와 table_rows행 표, images개의 이미지,
+    그리고 'Library' 페이지에 있는 synced_reuse개 동기화 블록 원본의 참조를 가집니다.
+    """
+    rng = random.Random(seed)
+    ws = FakeWorkspace()
+    counter = iter(range(10 ** 9))
+
+    def new_id(prefix):
+        return f"{prefix}-{next(counter):08d}"
+
+    def add_tree(parent_id, level):
+        for i in range(fanout):
+            kind = rng.choice(['paragraph', 'toggle', 'bulleted_list_item', 'heading_3'])
+            if level < depth and kind == 'paragraph':
+                kind = 'toggle'
+            block = ws.add_block(parent_id, {'id': new_id('block'), 'type': kind,
+                                             kind: {'rich_text': rich_text(f"{kind} {level}-{i} " * rng.randint(1, 8))}})
+            if level < depth and kind in ('toggle', 'bulleted_list_item'):
+                add_tree(block['id'], level + 1)
+
+    ws.add_page('library', 'Library')
+    originals = []
+    for i in range(synced_reuse):
+        original = ws.add_block('library', {'id': new_id('synced'), 'type': 'synced_block', 'synced_block': {'synced_from': None}})
+        for j in range(3):
+            ws.add_block(original['id'], {'id': new_id('block'), 'type': 'paragraph', 'paragraph': {'rich_text': rich_text(f"공유 헤더 {i}-{j}")}})
+        originals.append(original['id'])
+
+    ws.add_page('portfolio', 'Portfolio')
+    for p in range(pages):
+        page_id = f"page-{p:05d}"
+        ws.add_page(page_id, f"Page {p}", {'type': 'page_id', 'page_id': 'portfolio'})
+        for original_id in originals:
+            ws.add_block(page_id, {'id': new_id('synced'), 'type': 'synced_block', 'synced_block': {'synced_from': {'type': 'block_id', 'block_id': original_id}}})
+        add_tree(page_id, 1)
+        for i in range(images):
+            url = f"{base_url}/assets/{page_id}-{i}.png"
+            ws.add_block(page_id, {'id': new_id('image'), 'type': 'image', 'image': {'type': 'external', 'external': {'url': url}}})
+        if table_rows:
+            table = ws.add_block(page_id, {'id': new_id('table'), 'type': 'table', 'table': {'table_width': table_cols, 'has_column_header': True}})
+            for r in range(table_rows):
+                cells = [rich_text(f"셀 {r}-{c}" + ("\n둘째 줄" if rng.random() < 0.1 else "")) for c in range(table_cols)]
+                ws.add_block(table['id'], {'id': new_id('row'), 'type': 'table_row', 'table_row': {'cells': cells}})
+    return ws
+
+def paginate(items, query_or_body):
+    start = int(query_or_body.get('start_cursor') or 0)
+    size = int(query_or_body.get('page_size') or 100)
+    end = start + size
+    return {
+        'object': 'list', 'results': items[start:end],
+        'next_cursor': str(end) if end < len(items) else None, 'has_more': end < len(items),
+    }
+
+class LocalHTTPServer(ThreadingHTTPServer):
+    # 기본 listen backlog(5)로는 동시 요청이 몰리면 연결이 재시도되며 1초씩 지연됩니다.
+    request_queue_size = 256
+    daemon_threads = True
+
+class FakeNotionServer:
+    """백그라운드 스레드에서 도는 HTTP 서버입니다. with 문으로 사용합니다."""
+
+    def __init__(self, workspace=None, rate_limit_ratio=0.0, error_ratio=0.0, retry_after=1, latency=0.0, seed=0):
+        self.workspace = workspace
+        self.rate_limit_ratio = rate_limit_ratio
+        self.error_ratio = error_ratio
+        self.retry_after = retry_after
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.error_count = 0
+        self.failing_children = set()
+        self._lock = threading.Lock()
+        self._server = LocalHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _inject(self):
+        """이번 요청에 돌려줄 오류 (status, headers)를 정합니다. 없으면 None."""
+        with self._lock:
+            self.request_count += 1
+            roll = self.rng.random()
+            if roll < self.rate_limit_ratio:
+                self.rate_limited_count += 1
+                return 429, {'Retry-After': str(self.retry_after)}
+            if roll < self.rate_limit_ratio + self.error_ratio:
+                self.error_count += 1
+                return 502, {}
+        return None
+
+    def handle(self, method, path, query, body):
+        ws = self.workspace
+        parts = [p for p in path.split('/') if p][1:]  # 'v1' 제외
+        if method == 'POST' and parts == ['search']:
+            pages = list(ws.pages.values())
+            sort = body.get('sort') or {}
+            if sort.get('timestamp') == 'last_edited_time':
+                pages.sort(key=lambda page: page['last_edited_time'], reverse=sort.get('direction') == 'descending')
+            return 200, paginate(pages, body)
+        if method == 'GET' and len(parts) == 2 and parts[0] == 'pages' and parts[1] in ws.pages:
+            return 200, ws.pages[parts[1]]
+        if method == 'GET' and len(parts) == 2 and parts[0] == 'blocks' and parts[1] in ws.blocks:
+            return 200, ws.blocks[parts[1]]
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'blocks' and parts[2] == 'children':
+            if parts[1] in self.failing_children:
+                return 502, {'object': 'error', 'status': 502, 'code': 'service_unavailable', 'message': 'outage'}
+            if parts[1] in ws.children:
+                items = [ws.blocks[block_id] for block_id in ws.children[parts[1]]]
+                return 200, paginate(items, query)
+        return 404, {'object': 'error', 'status': 404, 'code': 'object_not_found', 'message': f'{path} not found'}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, method):
+                if server.latency:
+                    threading.Event().wait(server.latency)
+                parsed = urlparse(self.path)
+                if parsed.path.startswith('/assets/'):
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'image/png')
+                    self.send_header('Content-Length', str(len(PNG)))
+                    self.end_headers()
+                    self.wfile.write(PNG)
+                    return
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+                injected = server._inject()
+                headers = {}
+                if injected:
+                    status, headers = injected
+                    code = 'rate_limited' if status == 429 else 'service_unavailable'
+                    payload = {'object': 'error', 'status': status, 'code': code, 'message': 'injected'}
+                else:
+                    status, payload = server.handle(method, parsed.path, query, body)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+        return Handler
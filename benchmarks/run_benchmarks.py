@@ -0,0 +1,169 @@
+"""가짜 Notion 서버 위에서 내보내기 각 단계의 벤치마크를 돌리고 JSON으로 결과를 남깁니다.
+
+사용법:
+    python benchmarks/run_benchmarks.py --pages 20 --output results.json
+    python benchmarks/run_benchmarks.py --output new.json --compare results.json
+
+매 실행은 빈 임시 디렉터리에서 돌기 때문에 .etc/ 아래 캐시의 영향을 받지 않습니다.
+Chromium을 띄울 수 없는 환경에서는 PDF 시나리오를 건너뛰고 이유를 기록합니다.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config
+from fake_notion_server import FakeNotionServer, generate_workspace
+
+SCENARIOS = ['get_root_pages', 'fetch_all_child_blocks', 'blocks_to_html', 'export_single_pdf', 'export_and_merge_pdf']
+PDF_SCENARIOS = {'export_single_pdf', 'export_and_merge_pdf'}
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+def page_ids(args):
+    return [f"page-{p:05d}" for p in range(args.pages)]
+
+async def scenario_get_root_pages(args, state):
+    from notion_api import get_root_pages
+    start = time.perf_counter()
+    first_batch_s = None
+    async for _ in get_root_pages():
+        if first_batch_s is None:
+            first_batch_s = time.perf_counter() - start
+    return {'first_batch_s': first_batch_s}
+
+async def scenario_fetch_all_child_blocks(args, state):
+    from notion_api import create_notion_client, fetch_all_child_blocks
+    notion = create_notion_client()
+    await asyncio.gather(*(fetch_all_child_blocks(notion, page_id) for page_id in page_ids(args)))
+
+async def setup_blocks_to_html(args):
+    from notion_api import create_notion_client, fetch_all_child_blocks
+    notion = create_notion_client()
+    return await asyncio.gather(*(fetch_all_child_blocks(notion, page_id) for page_id in page_ids(args)))
+
+async def scenario_blocks_to_html(args, trees):
+    from exporter import blocks_to_html
+    for blocks in trees:
+        await blocks_to_html(blocks)
+
+async def scenario_export_single_pdf(args, state):
+    from browser_pool import BrowserPool
+    from exporter import export_single_pdf
+    from notion_api import create_notion_client
+    async with BrowserPool(size=1) as browser_pool:
+        await export_single_pdf(create_notion_client(), page_ids(args)[0], 0, browser_pool)
+
+async def scenario_export_and_merge_pdf(args, state):
+    from exporter import export_and_merge_pdf
+    await export_and_merge_pdf(page_ids(args), os.path.join('.etc', 'bench.pdf'), None, args.single_document, args.workers or None)
+
+async def chromium_available():
+    from browser_pool import BrowserPool
+    try:
+        async with BrowserPool(size=1):
+            return None
+    except Exception as e:
+        return str(e).splitlines()[0]
+
+def run_scenario(name, args, server):
+    setup = globals().get(f"setup_{name}")
+    scenario = globals()[f"scenario_{name}"]
+    runs = []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as work_dir:
+            cwd = os.getcwd()
+            shutil.copy(os.path.join(ROOT, 'portfolio_style.css'), work_dir)
+            os.chdir(work_dir)
+            try:
+                state = asyncio.run(setup(args)) if setup else None
+                requests_before = server.request_count
+                start = time.perf_counter()
+                extra = asyncio.run(scenario(args, state))
+                runs.append({'seconds': time.perf_counter() - start, 'requests': server.request_count - requests_before, **(extra or {})})
+            finally:
+                os.chdir(cwd)
+    seconds = [run['seconds'] for run in runs]
+    return {'runs': runs, 'median_s': statistics.median(seconds), 'min_s': min(seconds)}
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n{'시나리오':<24}{'기준':>10}{'현재':>10}{'비율':>8}")
+    for name, result in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name, {})
+        if 'median_s' not in result or 'median_s' not in old:
+            continue
+        ratio = result['median_s'] / old['median_s'] if old['median_s'] else float('inf')
+        print(f"{name:<24}{old['median_s']:>9.3f}s{result['median_s']:>9.3f}s{ratio:>7.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--table-rows', type=int, default=50)
+    parser.add_argument('--table-cols', type=int, default=5)
+    parser.add_argument('--synced-reuse', type=int, default=2)
+    parser.add_argument('--images', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.0, help="요청마다 서버가 지연할 초")
+    parser.add_argument('--rate', type=float, default=1000.0, help="클라이언트 요청 한도 (회/초), 실제 Notion은 약 3")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--single-document', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="결과 JSON 경로 (없으면 표준 출력)")
+    parser.add_argument('--compare', help="비교할 기존 결과 JSON")
+    args = parser.parse_args()
+
+    # 스케줄러 모듈을 불러오기 전에 요청 한도를 바꿔야 기본값에 반영됩니다.
+    config.NOTION_RATE_LIMIT = args.rate
+    config.NOTION_RATE_BURST = max(config.NOTION_RATE_BURST, int(args.rate))
+
+    params = {key: value for key, value in vars(args).items() if key not in ('scenarios', 'output', 'compare')}
+    results = {'commit': git_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'python': platform.python_version(), 'params': params, 'scenarios': {}}
+
+    with FakeNotionServer(latency=args.latency, seed=args.seed) as server:
+        server.workspace = generate_workspace(server.base_url, args.pages, args.depth, args.fanout, args.table_rows,
+                                              args.table_cols, args.synced_reuse, args.images, args.seed)
+        os.environ['NOTION_BASE_URL'] = server.base_url
+        os.environ['NOTION_API_KEY'] = 'benchmark'
+        skip_reason = None
+        if PDF_SCENARIOS & set(args.scenarios):
+            skip_reason = asyncio.run(chromium_available())
+        for name in args.scenarios:
+            if name in PDF_SCENARIOS and skip_reason:
+                results['scenarios'][name] = {'skipped': skip_reason}
+                print(f"{name:<24} 건너뜀: {skip_reason}", file=sys.stderr)
+                continue
+            result = run_scenario(name, args, server)
+            results['scenarios'][name] = result
+            print(f"{name:<24} 중앙값 {result['median_s']:.3f}s (요청 {result['runs'][0]['requests']}회)", file=sys.stderr)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+from datetime import datetime, timezone
+from config import BLOCK_CACHE_PATH, BLOCK_CACHE_MAX_BYTES
+
+class BlockCache:
+    """블록 트리를 SQLite에 저장하는 디스크 캐시입니다.
+
+    항목은 블록 id를 키로 하고, 저장 당시의 last_edited_time과 일치할 때만 사용됩니다.
+    fetch_all_child_blocks는 페이지와 동기화 블록 원본의 트리 전체를 한 항목으로 저장하므로,
+    바뀐 가지만이 아니라 바뀐 페이지 전체를 다시 가져옵니다.
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 지웁니다.
+    asset_cache가 있으면 서명이 만료된 이미지 URL도 로컬에 받아둔 경우에는 계속 사용합니다.
+    """
+
+    def __init__(self, path=BLOCK_CACHE_PATH, max_bytes=BLOCK_CACHE_MAX_BYTES, asset_cache=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.asset_cache = asset_cache
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, last_edited_time TEXT, payload BLOB, "
+            "raw_size INTEGER, size INTEGER, accessed REAL)"
+        )
+        self._conn.commit()
+
+    def lookup(self, key, last_edited_time):
+        """(값, 원본 크기)를 반환합니다. 없거나 last_edited_time이 다르면 (None, 0)."""
+        row = self._conn.execute(
+            "SELECT last_edited_time, payload, raw_size FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if not row or row[0] != last_edited_time:
+            return None, 0
+        self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return json.loads(zlib.decompress(row[1])), row[2]
+
+    def store(self, key, last_edited_time, value):
+        raw = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        payload = zlib.compress(raw)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+            (key, last_edited_time, payload, len(raw), len(payload), time.time()),
+        )
+        self._evict()
+        self._conn.commit()
+
+    def files_usable(self, files):
+        """캐시된 트리의 Notion 파일 URL들이 아직 쓸 수 있는지 확인합니다."""
+        now = datetime.now(timezone.utc)
+        for url, expiry_time in files:
+            if not expiry_time or datetime.fromisoformat(expiry_time.replace('Z', '+00:00')) > now:
+                continue
+            if self.asset_cache is None or not self.asset_cache.has(url):
+                return False
+        return True
+
+    def hit(self, raw_size):
+        self.hits += 1
+        self.bytes_saved += raw_size
+
+    def miss(self):
+        self.misses += 1
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return (f"블록 캐시: 적중 {self.hits} / 미적중 {self.misses} ({rate:.1f}%), "
+                f"절약한 데이터 {self.bytes_saved / 1024:.1f}KB")
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,179 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from config import EXPORT_CONCURRENCY, BROWSER_CONTEXT_MAX_RENDERS, BROWSER_ACQUIRE_TIMEOUT, RENDER_TIMEOUT, RENDER_WAIT_MODE, RENDER_ASSET_TIMEOUT_MS
+
+PDF_OPTIONS = {'format': 'A4', 'print_background': True}
+
+# 스타일시트 @import, 이미지, 폰트를 각각 timeout_ms 안에서 기다리고 시간 초과된 항목을 반환합니다.
+RENDER_READY_SCRIPT = """
+async (timeoutMs) => {
+    const timedOut = [];
+    const within = (promise, ms) => Promise.race([
+        promise.then(() => true, () => true),
+        new Promise(resolve => setTimeout(() => resolve(false), ms)),
+    ]);
+    const imports = [];
+    for (const sheet of Array.from(document.styleSheets)) {
+        let rules = [];
+        try { rules = Array.from(sheet.cssRules); } catch (e) {}
+        rules.filter(rule => rule instanceof CSSImportRule).forEach(rule => imports.push(rule));
+    }
+    await Promise.all(imports.map(async rule => {
+        const loaded = new Promise(resolve => {
+            const poll = () => rule.styleSheet ? resolve() : setTimeout(poll, 20);
+            poll();
+        });
+        if (!await within(loaded, timeoutMs)) timedOut.push(rule.href);
+    }));
+    await Promise.all(Array.from(document.images).map(async img => {
+        const done = img.complete ? Promise.resolve() : img.decode();
+        if (!await within(done, timeoutMs)) timedOut.push(img.currentSrc || img.src);
+    }));
+    if (!await within(document.fonts.ready, timeoutMs)) timedOut.push('document.fonts');
+    return timedOut;
+}
+"""
+
+async def load_content(page, full_html):
+    """HTML을 탭에 넣고 렌더링에 필요한 자산이 준비될 때까지 기다립니다."""
+    if RENDER_WAIT_MODE == "networkidle":
+        await page.set_content(full_html, wait_until="networkidle")
+        return
+    await page.set_content(full_html, wait_until="domcontentloaded")
+    timed_out = await page.evaluate(RENDER_READY_SCRIPT, RENDER_ASSET_TIMEOUT_MS)
+    if timed_out:
+        print(f"렌더링 대기 시간 초과 ({RENDER_ASSET_TIMEOUT_MS}ms): {', '.join(timed_out)}")
+
+class BrowserPool:
+    """Chromium 하나를 띄워두고 워커들에게 브라우저 컨텍스트를 나눠주는 풀입니다.
+
+    컨텍스트는 max_renders번 렌더링하면 닫고 새로 만들어 메모리 증가를 막습니다.
+    Chromium이 죽으면 다음에 컨텍스트를 새로 만들 때 브라우저를 다시 띄우고, 죽은 브라우저의 컨텍스트는
+    반납할 때 바꿉니다. 바꾸지 못해도 빌린 컨텍스트는 항상 풀에 돌려놓으므로 풀이 비어 멈추지 않습니다.
+    컨텍스트를 빌리는 대기와 한 페이지 렌더링에는 각각 acquire_timeout, render_timeout(초)이 있습니다.
+    asset_cache가 주어지면 캐시된 이미지 요청은 네트워크 대신 로컬 파일로 응답합니다.
+    """
+
+    def __init__(self, size=EXPORT_CONCURRENCY, max_renders=BROWSER_CONTEXT_MAX_RENDERS, asset_cache=None,
+                 acquire_timeout=BROWSER_ACQUIRE_TIMEOUT, render_timeout=RENDER_TIMEOUT):
+        self.size = size
+        self.max_renders = max_renders
+        self.asset_cache = asset_cache
+        self.acquire_timeout = acquire_timeout
+        self.render_timeout = render_timeout
+        self.relaunches = 0
+        self._playwright = None
+        self._browser = None
+        self._contexts = None
+        self._render_counts = {}
+        self._launch_lock = asyncio.Lock()
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._contexts = asyncio.Queue()
+        for _ in range(self.size):
+            await self._contexts.put(await self._new_context())
+        return self
+
+    async def close(self):
+        if self._contexts is not None:
+            while not self._contexts.empty():
+                context = self._contexts.get_nowait()
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._contexts = None
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        self._render_counts.clear()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _ensure_browser(self):
+        """브라우저가 죽었으면 다시 띄웁니다. 여러 워커가 동시에 알아채도 한 번만 띄웁니다."""
+        async with self._launch_lock:
+            if self._browser.is_connected():
+                return
+            print("Chromium 연결이 끊겨 브라우저를 다시 띄웁니다.")
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self.relaunches += 1
+
+    async def _new_context(self):
+        await self._ensure_browser()
+        context = await self._browser.new_context()
+        if self.asset_cache is not None:
+            await context.route(self.asset_cache.has, self.asset_cache.handle_route)
+        self._render_counts[id(context)] = 0
+        return context
+
+    async def _recycle(self, context):
+        self._render_counts.pop(id(context), None)
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"브라우저 컨텍스트 종료 오류: {e}")
+        return await self._new_context()
+
+    async def _refresh(self, context, used_up=False):
+        """다 쓴 컨텍스트나 죽은 브라우저의 컨텍스트를 새것으로 바꿉니다. 바꾸지 못하면 그대로 돌려줍니다."""
+        if not used_up and context.browser is self._browser and self._browser.is_connected():
+            return context
+        try:
+            return await self._recycle(context)
+        except Exception as e:
+            # 바꾸지 못한 컨텍스트도 풀에 돌려놓아야 다른 워커가 기다리다 멈추지 않습니다.
+            # 그 컨텍스트를 빌린 렌더링은 빠르게 실패하고, 다음에 빌릴 때 다시 바꿔 봅니다.
+            print(f"브라우저 컨텍스트 교체 오류: {e}")
+            return context
+
+    async def render(self, full_html):
+        """HTML을 탭에 넣고 준비되면 PDF 바이트를 반환합니다. render_timeout을 넘기면 TimeoutError를 던집니다."""
+        async def render_page(page):
+            await load_content(page, full_html)
+            return await page.pdf(**PDF_OPTIONS)
+
+        async with self.page() as page:
+            try:
+                return await asyncio.wait_for(render_page(page), self.render_timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"PDF 렌더링이 {self.render_timeout}초 안에 끝나지 않았습니다") from None
+
+    @asynccontextmanager
+    async def page(self):
+        """풀에서 컨텍스트를 빌려 새 탭을 열고, 사용 후 반납합니다."""
+        try:
+            context = await asyncio.wait_for(self._contexts.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"브라우저 컨텍스트를 {self.acquire_timeout}초 안에 얻지 못했습니다") from None
+        page = None
+        try:
+            context = await self._refresh(context)
+            page = await context.new_page()
+            yield page
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            self._render_counts[id(context)] = self._render_counts.get(id(context), 0) + 1
+            context = await self._refresh(context, self._render_counts[id(context)] >= self.max_renders)
+            self._contexts.put_nowait(context)
@@ -0,0 +1,99 @@
+import os
+import json
+import shutil
+import hashlib
+from config import TEMP_DIR
+from utils import atomic_write
+
+class ExportCheckpoint:
+    """이어서 할 수 있는 내보내기의 진행 기록입니다.
+
+    같은 출력 경로와 페이지 목록이면 같은 디렉터리(temp_root/resume-<해시>)를 씁니다.
+    페이지 HTML을 만들면 본문을, 렌더링하면 PDF를 그 디렉터리에 저장하고 journal.jsonl에
+    한 줄씩 기록하므로, 중간에 죽은 실행을 다시 시작하면 끝난 페이지는 건너뜁니다.
+    """
+
+    def __init__(self, final_pdf_path, page_ids, temp_root=TEMP_DIR):
+        key = hashlib.sha256(json.dumps([os.path.abspath(final_pdf_path), list(page_ids)]).encode('utf-8')).hexdigest()[:16]
+        self.run_dir = os.path.join(temp_root, f"resume-{key}")
+        self.journal_path = os.path.join(self.run_dir, 'journal.jsonl')
+        # 페이지 id -> 기록. fetched는 {'last_edited_time'}, rendered는 {'last_edited_time', 'hash'}입니다.
+        self.fetched = {}
+        self.rendered = {}
+        self._journal = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _file(self, page_id, suffix):
+        return os.path.join(self.run_dir, hashlib.sha1(page_id.encode('utf-8')).hexdigest() + suffix)
+
+    def open(self):
+        """이전 기록을 읽고(파일이 사라진 항목은 버립니다) 새 기록을 덧붙일 준비를 합니다."""
+        os.makedirs(self.run_dir, exist_ok=True)
+        try:
+            with open(self.journal_path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 기록 도중 죽어 잘린 마지막 줄입니다.
+                continue
+            page_id = record.pop('page_id')
+            stage = record.pop('stage')
+            if stage == 'fetched' and os.path.exists(self._file(page_id, '.json')):
+                self.fetched[page_id] = record
+            elif stage == 'rendered' and os.path.exists(self._file(page_id, '.pdf')):
+                self.rendered[page_id] = record
+        if self.fetched or self.rendered:
+            print(f"체크포인트에서 이어서 합니다: HTML {len(self.fetched)}개, PDF {len(self.rendered)}개 ({self.run_dir})")
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        return self
+
+    def _write_file(self, path, data):
+        with atomic_write(path) as f:
+            f.write(data)
+
+    def _append(self, record):
+        self._journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._journal.flush()
+
+    def record_fetched(self, page_id, last_edited_time, content):
+        """페이지의 (제목, 본문 HTML)을 저장합니다."""
+        title, body_html = content
+        self._write_file(self._file(page_id, '.json'), json.dumps({'title': title, 'body_html': body_html}, ensure_ascii=False).encode('utf-8'))
+        self.fetched[page_id] = {'last_edited_time': last_edited_time}
+        self._append({'page_id': page_id, 'stage': 'fetched', 'last_edited_time': last_edited_time})
+
+    def content(self, page_id):
+        """저장한 (last_edited_time, (제목, 본문 HTML))을 반환합니다."""
+        with open(self._file(page_id, '.json'), encoding='utf-8') as f:
+            data = json.load(f)
+        return self.fetched[page_id]['last_edited_time'], (data['title'], data['body_html'])
+
+    def record_rendered(self, page_id, data, last_edited_time, content_hash):
+        """렌더링한 PDF 바이트를 저장하고 그 파일 경로를 반환합니다."""
+        path = self._file(page_id, '.pdf')
+        self._write_file(path, data)
+        self.rendered[page_id] = {'last_edited_time': last_edited_time, 'hash': content_hash}
+        self._append({'page_id': page_id, 'stage': 'rendered', 'last_edited_time': last_edited_time, 'hash': content_hash})
+        return path
+
+    def pdf_path(self, page_id):
+        return self._file(page_id, '.pdf')
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def clear(self):
+        """내보내기가 끝까지 성공하면 기록을 지웁니다."""
+        self.close()
+        shutil.rmtree(self.run_dir, ignore_errors=True)
@@ -0,0 +1,146 @@
+"""GUI 없이 Notion 페이지를 PDF로 내보내는 명령줄 진입점입니다.
+
+예: python cli.py 1a2b3c... "포트폴리오*" -o out.pdf --workers 8
+    python cli.py "포트폴리오*" --per-root out/ --merged -o out/all.pdf
+"""
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+from fnmatch import fnmatch
+from dotenv import load_dotenv
+from config import FINAL_PDF_PATH
+from notion_api import create_notion_client, load_workspace_index, collect_export_page_ids, collect_export_page_groups
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_PAGES = 3
+# 재시도 후에도 실패한 페이지가 있어 나머지 페이지로만 PDF를 만든 경우
+EXIT_PARTIAL = 4
+
+PAGE_ID_PATTERN = re.compile(r'[0-9a-fA-F]{32}|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}')
+
+def is_page_id(value):
+    return PAGE_ID_PATTERN.fullmatch(value) is not None
+
+async def resolve_roots(targets):
+    """페이지 id는 그대로, 나머지는 루트 페이지 제목 패턴(fnmatch, 대소문자 무시)으로 찾습니다."""
+    root_ids = [target for target in targets if is_page_id(target)]
+    patterns = [target.lower() for target in targets if not is_page_id(target)]
+    if patterns:
+        index = await load_workspace_index()
+        for page_id in index.roots:
+            title = index.title(page_id).lower()
+            if any(fnmatch(title, pattern) for pattern in patterns):
+                root_ids.append(page_id)
+    return list(dict.fromkeys(root_ids))
+
+async def collect_page_ids(root_ids, expand_children=True, notion_client=None):
+    """GUI와 같이 각 루트의 첫 번째 하위 페이지 목록으로 펼칩니다. 하위 페이지가 없으면 루트 자체를 씁니다."""
+    if not expand_children:
+        return root_ids
+    return await collect_export_page_ids(root_ids, notion_client or create_notion_client())
+
+async def collect_page_groups(root_ids, expand_children=True, notion_client=None):
+    """collect_page_ids와 같지만 루트마다 (루트 id, 페이지 id 목록)으로 나눠 반환합니다."""
+    if not expand_children:
+        return [(root_id, [root_id]) for root_id in root_ids]
+    return await collect_export_page_groups(root_ids, notion_client or create_notion_client())
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Notion 페이지를 PDF로 내보냅니다.")
+    parser.add_argument('targets', nargs='+', help="루트 페이지 id 또는 제목 패턴 (예: '포트폴리오*')")
+    parser.add_argument('-o', '--output', default=FINAL_PDF_PATH, help=f"출력 PDF 경로 (기본: {FINAL_PDF_PATH})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="렌더링 프로세스 수, 프로세스마다 브라우저 하나 (기본: CPU 코어 수, 0이면 단일 프로세스)")
+    parser.add_argument('--no-children', action='store_true', help="하위 페이지로 펼치지 않고 루트 페이지 자체를 내보냅니다.")
+    parser.add_argument('--per-root', metavar='DIR',
+                        help="루트마다 PDF 하나를 DIR에 만듭니다. 모든 출력이 클라이언트, 캐시, 브라우저를 함께 씁니다.")
+    parser.add_argument('--merged', action='store_true', help="--per-root와 함께 쓰면 -o 경로에 전체 병합본도 만듭니다.")
+    parser.add_argument('--single-document', action='store_true', help="모든 페이지를 하나의 HTML 문서로 렌더링합니다.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="이전 출력의 매니페스트와 비교해 내용이 바뀐 페이지만 다시 렌더링합니다.")
+    parser.add_argument('--resume', action='store_true',
+                        help="페이지별 진행을 체크포인트로 남기고, 중단된 같은 내보내기가 있으면 끝난 페이지는 건너뜁니다.")
+    parser.add_argument('--trace', metavar='PATH', help="단계별 구간을 Chrome trace JSON으로 저장하고 요약 표를 출력합니다.")
+    parser.add_argument('-q', '--quiet', action='store_true', help="진행 상황을 출력하지 않습니다.")
+    return parser
+
+async def run(args):
+    # playwright/PyPDF2는 실제로 내보낼 때만 불러와 --help나 인수 오류 응답을 빠르게 합니다.
+    from exporter import export_and_merge_pdf, export_each_root, PageExportError
+    root_ids = await resolve_roots(args.targets)
+    if not root_ids:
+        print("일치하는 페이지가 없습니다.", file=sys.stderr)
+        return None, 0, False
+    # 하위 페이지 탐색과 내보내기가 같은 클라이언트(요청 스케줄러)를 씁니다.
+    notion = create_notion_client()
+    if args.per_root:
+        page_groups = await collect_page_groups(root_ids, not args.no_children, notion)
+        page_count = sum(len(page_ids) for _, page_ids in page_groups)
+    else:
+        page_ids = await collect_page_ids(root_ids, not args.no_children, notion)
+        page_count = len(page_ids)
+
+    stage_counts = {}
+    def stage_callback(stage, completed, total):
+        stage_counts[stage] = completed
+        if not args.quiet:
+            counts = ' '.join(f"{name} {count}/{total}" for name, count in stage_counts.items())
+            print(f"[{counts}]", file=sys.stderr)
+
+    try:
+        if args.per_root:
+            result = await export_each_root(page_groups, args.per_root, merged_pdf_path=args.output if args.merged else None,
+                                            single_document=args.single_document, workers=args.workers or None,
+                                            trace_path=args.trace, notion_client=notion, stage_callback=stage_callback,
+                                            incremental=args.incremental, resume=args.resume)
+        else:
+            result = await export_and_merge_pdf(page_ids, args.output, single_document=args.single_document,
+                                                workers=args.workers or None, trace_path=args.trace, notion_client=notion,
+                                                stage_callback=stage_callback, incremental=args.incremental, resume=args.resume)
+    except PageExportError as e:
+        # 실패한 페이지를 뺀 나머지로 만든 PDF는 남아 있습니다.
+        print(f"일부 페이지 실패: {e}", file=sys.stderr)
+        return e.output_path, page_count, True
+    return result, page_count, False
+
+def print_outputs(result):
+    """만든 PDF 경로를 한 줄에 하나씩 표준 출력으로 씁니다. (--per-root면 여러 개)"""
+    for path in (result if isinstance(result, list) else [result]):
+        print(path)
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.merged and not args.per_root:
+        parser.error("--merged는 --per-root와 함께 써야 합니다.")
+    load_dotenv()
+    if not os.getenv("NOTION_API_KEY"):
+        print("NOTION_API_KEY 환경 변수가 필요합니다.", file=sys.stderr)
+        return EXIT_USAGE
+    start_time = time.time()
+    try:
+        result, page_count, partial = asyncio.run(run(args))
+    except Exception as e:
+        print(f"PDF 생성 실패: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    if page_count == 0:
+        return EXIT_NO_PAGES
+    if not result:
+        print("PDF 생성 실패", file=sys.stderr)
+        return EXIT_FAILED
+    if partial:
+        print_outputs(result)
+        return EXIT_PARTIAL
+    if not args.quiet:
+        outputs = ', '.join(result) if isinstance(result, list) else result
+        print(f"PDF 생성 완료: {outputs} ({page_count}페이지, 총 {time.time() - start_time:.2f}초)", file=sys.stderr)
+    print_outputs(result)
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,67 @@
 TEMP_DIR = ".etc/temp"
+# 페이지별 PDF를 병합 전까지 메모리에 둘 최대 크기 (넘으면 실행별 임시 디렉터리에 씁니다)
+PDF_SPOOL_MAX_MEMORY_BYTES = 256 * 1024 * 1024
+# 병합 중인 출력은 이 쪽 수마다 디스크의 조각 파일로 내보내고 메모리에서 내려놓습니다
+PDF_MERGE_SEGMENT_PAGES = 64
 FINAL_PDF_NAME = "My_Portfolio_Final.pdf"
-FINAL_PDF_PATH = ".etc/" + FINAL_PDF_NAME 
\ No newline at end of file
+FINAL_PDF_PATH = ".etc/" + FINAL_PDF_NAME
+# 루트마다 PDF를 따로 만들 때 쓰는 디렉터리
+PER_ROOT_OUTPUT_DIR = ".etc/roots"
+
+# PDF 렌더링 동시 작업 수 / 브라우저 컨텍스트 재활용 주기
+EXPORT_CONCURRENCY = 4
+BROWSER_CONTEXT_MAX_RENDERS = 20
+# 브라우저 컨텍스트를 빌리기까지 / 페이지 하나를 렌더링하기까지 기다릴 최대 시간(초)
+BROWSER_ACQUIRE_TIMEOUT = 120.0
+RENDER_TIMEOUT = 120.0
+
+# 페이지별 내보내기 파이프라인: 단계마다 워커 수를 따로 두고, 단계 사이 큐 크기로 앞 단계가 앞서갈 수 있는 양을 제한합니다.
+EXPORT_FETCH_WORKERS = 4
+EXPORT_HTML_WORKERS = 1
+EXPORT_RENDER_WORKERS = EXPORT_CONCURRENCY
+EXPORT_QUEUE_SIZE = 4
+# 페이지 한 단계가 실패했을 때 다시 시도할 횟수와 첫 대기 시간(초, 시도마다 두 배)
+EXPORT_PAGE_RETRIES = 2
+EXPORT_PAGE_RETRY_BACKOFF = 1.0
+
+# 블록 트리 조회 시 동시에 보낼 children.list 요청 수
+FETCH_CONCURRENCY = 8
+
+# 블록 트리 디스크 캐시 (last_edited_time으로 검증)
+BLOCK_CACHE_PATH = ".etc/cache/blocks.sqlite"
+BLOCK_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Notion API 요청 스케줄러 (평균 약 3회/초, 버스트 허용)
+NOTION_RATE_LIMIT = 3.0
+NOTION_RATE_BURST = 10
+NOTION_MAX_RETRIES = 5
+NOTION_BACKOFF_BASE = 1.0
+NOTION_BACKOFF_MAX = 30.0
+
+# 단일 문서 렌더링 한도 (넘으면 페이지별 렌더링 + 병합으로 전환)
+SINGLE_DOCUMENT_MAX_PAGES = 150
+SINGLE_DOCUMENT_MAX_HTML_BYTES = 30 * 1024 * 1024
+
+# 렌더링된 PDF 캐시 (HTML 내용 해시 기준)
+RENDER_CACHE_DIR = ".etc/cache/pdf"
+RENDER_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# 이미지 에셋 캐시 (서명이 바뀌지 않는 파일 경로 기준)
+ASSET_CACHE_DIR = ".etc/cache/assets"
+ASSET_DOWNLOAD_CONCURRENCY = 8
+ASSET_DOWNLOAD_TIMEOUT = 30.0
+ASSET_CACHE_MAX_BYTES = 500 * 1024 * 1024
+# 외부 URL 이미지는 받은 지 이 시간(초)이 지나면 조건부 요청으로 바뀌었는지 확인합니다.
+ASSET_EXTERNAL_REVALIDATE_AFTER = 24 * 60 * 60
+
+# 렌더링 준비 대기 방식: "assets"(폰트/이미지만 확인) 또는 "networkidle"
+RENDER_WAIT_MODE = "assets"
+RENDER_ASSET_TIMEOUT_MS = 5000
+
+# 단계별 추적 (None이면 끔, 경로를 주면 Chrome trace JSON을 씁니다)
+EXPORT_TRACE_PATH = None
+
+# 워크스페이스 페이지 목록 스냅샷 (다음 실행 때 바로 보여주고 변경분만 동기화)
+WORKSPACE_SNAPSHOT_PATH = ".etc/cache/workspace.json"
+# 이 시간이 지나면 변경분 대신 전체 목록을 다시 받아 완전히 삭제된 페이지를 정리합니다.
+WORKSPACE_FULL_SYNC_INTERVAL = 24 * 60 * 60
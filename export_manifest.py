@@ -0,0 +1,39 @@
+import os
+import json
+from utils import atomic_write
+
+MANIFEST_VERSION = 1
+
+def manifest_path(output_path):
+    """출력 PDF 옆에 두는 매니페스트 경로입니다."""
+    return f"{output_path}.manifest.json"
+
+def save_manifest(output_path, pages):
+    """출력 PDF를 만든 페이지 목록을 저장합니다.
+
+    pages는 {'page_id', 'last_edited_time', 'hash', 'start', 'count'} 목록이며, start/count는
+    최종 PDF 안에서 그 페이지가 차지하는 쪽 범위입니다. 출력 파일 크기도 함께 적어 두어
+    다른 방법으로 덮어쓴 PDF를 재사용하지 않게 합니다.
+    """
+    path = manifest_path(output_path)
+    data = {'version': MANIFEST_VERSION, 'output_size': os.path.getsize(output_path), 'pages': pages}
+    try:
+        with atomic_write(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    except Exception as e:
+        print(f"내보내기 매니페스트 저장 오류: {e}")
+
+def load_manifest(output_path):
+    """이전 출력의 {페이지 id: 항목}을 읽습니다. 매니페스트나 출력이 없거나 서로 맞지 않으면 빈 dict입니다."""
+    try:
+        with open(manifest_path(output_path), encoding='utf-8') as f:
+            data = json.load(f)
+        output_size = os.path.getsize(output_path)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"내보내기 매니페스트 읽기 오류: {e}")
+        return {}
+    if data.get('version') != MANIFEST_VERSION or data.get('output_size') != output_size:
+        return {}
+    return {entry['page_id']: entry for entry in data['pages']}
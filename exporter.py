@@ -1,37 +1,33 @@
 import os
 import re
 import asyncio
-from notion_client import AsyncClient
-from playwright.async_api import async_playwright
-from PyPDF2 import PdfMerger
-from config import TEMP_DIR, FINAL_PDF_PATH
-from notion_api import fetch_all_child_blocks, get_synced_block_original_and_top_parent
+from config import FINAL_PDF_PATH, EXPORT_FETCH_WORKERS, EXPORT_HTML_WORKERS, EXPORT_RENDER_WORKERS, EXPORT_PAGE_RETRIES, SINGLE_DOCUMENT_MAX_PAGES, SINGLE_DOCUMENT_MAX_HTML_BYTES, EXPORT_TRACE_PATH
+from browser_pool import BrowserPool, PDF_OPTIONS
+from render_workers import ProcessRenderPool
+from pipeline import StagedPipeline
+from pdf_spool import PdfSpool
+from pdf_merge import OrderedPdfMerger, PageRange, PdfPages, concatenate_pdfs
+from export_manifest import load_manifest, save_manifest
+from checkpoint import ExportCheckpoint
+from block_cache import BlockCache
+from render_cache import RenderCache
+from asset_cache import AssetCache, collect_image_urls
+from html_renderer import render_blocks
+from notion_api import fetch_all_child_blocks, BlockResolver, create_notion_client
 from utils import extract_page_title
+import tracing
 
-NOTION_COLOR_MAP = {
-    'default': '#000000',
-    'gray': '#787774',
-    'brown': '#9F6B53',
-    'orange': '#D9730D',
-    'yellow': '#CB912F',
-    'green': '#448361',
-    'blue': '#337EA9',
-    'purple': '#9065B0',
-    'pink': '#C14C8A',
-    'red': '#D44C47'
-}
-NOTION_BG_MAP = {
-    'default': '#FFFFFF',
-    'gray_background': '#F1F1EF',
-    'brown_background': '#F4EEEE',
-    'orange_background': '#FAEBDD',
-    'yellow_background': '#FBF3DB',
-    'green_background': '#EDF3EC',
-    'blue_background': '#E7F3F8',
-    'purple_background': '#F6F3F9',
-    'pink_background': '#FAF1F5',
-    'red_background': '#FDEBEC'
-}
+class PageExportError(Exception):
+    """재시도 후에도 일부 페이지를 내보내지 못했을 때 던집니다. 나머지 페이지로 만든 PDF는 output_path에 있습니다."""
+
+    def __init__(self, output_path, failures, resumable=False):
+        # 루트별 내보내기(export_each_root)에서는 만든 PDF 경로 목록입니다.
+        self.output_path = output_path
+        self.failures = failures
+        self.resumable = resumable
+        outputs = ', '.join(output_path) if isinstance(output_path, list) else output_path
+        hint = " 같은 옵션으로 다시 실행하면 실패한 페이지만 다시 시도합니다." if resumable else ""
+        super().__init__(f"{len(failures)}개 페이지 실패: {', '.join(failures)} (나머지 페이지 PDF: {outputs}).{hint}")
 
 def get_styles():
     css_path = os.path.join(os.getcwd(), 'portfolio_style.css')
@@ -43,263 +39,429 @@ def get_styles():
         return ""
 
 # extract_page_title 함수는 utils.py로 이동됨
+# 블록 -> HTML 변환은 html_renderer.py로 이동됨 (블록 타입별 렌더러 등록 방식)
 
-def rich_text_to_html(rich_text_array, process_nested_bullets=False):
-    if not rich_text_array:
-        return ""
-    html = ""
-    for chunk in rich_text_array:
-        href = chunk.get("href")
-        text = chunk.get('plain_text', '').replace('\n', '<br>')
-        if href:
-            html += f'<a href="{href}" target="_blank">{text}</a>'
+async def blocks_to_html(blocks, notion_client=None):
+    """기존 호출부 호환용 래퍼입니다. 변환 자체는 I/O가 없으므로 동기 함수로 처리합니다."""
+    return render_blocks(blocks)
+
+async def render_pdf(full_html, pdf_path=None, browser_pool=None, render_cache=None, page_id=None, cache_key=None):
+    """HTML을 PDF로 렌더링합니다. browser_pool이 없으면 브라우저를 새로 띄웁니다.
+
+    pdf_path가 주어지면 그 파일에 쓰고 경로를, 없으면 PDF 바이트를 반환합니다.
+    browser_pool은 render(full_html) -> 바이트를 제공하는 BrowserPool 또는 ProcessRenderPool입니다.
+    render_cache가 주어지면 같은 HTML/옵션으로 만든 PDF가 있을 때 렌더링을 건너뜁니다.
+    이미 RenderCache.key(full_html, PDF_OPTIONS)를 계산했다면 cache_key로 넘겨 다시 해시하지 않게 합니다.
+    """
+    with tracing.span('render', page_id):
+        data = None
+        if render_cache is None:
+            cache_key = None
         else:
-            html += apply_annotations(text, chunk)
-    return html
+            cache_key = cache_key or render_cache.key(full_html, PDF_OPTIONS)
+            data = render_cache.fetch(cache_key)
+            if data is not None:
+                tracing.add('cache_hits')
+        if data is None:
+            if browser_pool is not None:
+                data = await browser_pool.render(full_html)
+            else:
+                async with BrowserPool(size=1) as single_browser:
+                    data = await single_browser.render(full_html)
+            if cache_key is not None:
+                render_cache.store(cache_key, data)
+        tracing.add('bytes', len(data))
+    if pdf_path is None:
+        return data
+    with open(pdf_path, 'wb') as f:
+        f.write(data)
+    return pdf_path
+
+async def fetch_page_blocks(notion_client, page_id, block_cache=None, resolver=None, asset_cache=None):
+    """페이지 정보와 블록 트리를 가져옵니다. asset_cache가 주어지면 페이지의 이미지도 미리 내려받아 둡니다."""
+    # pages.retrieve는 블록 캐시 검증에 쓰이는 last_edited_time을 얻기 위해 항상 호출합니다.
+    with tracing.span('fetch', page_id):
+        page_info = await notion_client.pages.retrieve(page_id=page_id)
+        blocks = await fetch_all_child_blocks(notion_client, page_id, cache=block_cache, last_edited_time=page_info.get('last_edited_time'), resolver=resolver)
+    if asset_cache is not None:
+        with tracing.span('assets', page_id):
+            await asset_cache.prefetch(collect_image_urls(blocks))
+    return page_info, blocks
+
+def build_page_html(page_title, blocks, page_id=None):
+    """페이지 제목과 블록 트리로 본문 HTML(제목 h1 포함)을 만듭니다."""
+    with tracing.span('html', page_id):
+        content_html = render_blocks(blocks)
+        tracing.add('bytes', len(content_html))
 
-def apply_annotations(text, chunk):
-    if not text:
-        return ""
-    href = chunk.get('href')
-    if href:
-        return f'<a href="{href}">{text}</a>'
-    annotations = chunk.get('annotations', {})
-    if annotations.get('bold'): text = f'<strong>{text}</strong>'
-    if annotations.get('italic'): text = f'<em>{text}</em>'
-    if annotations.get('underline'): text = f'<u>{text}</u>'
-    if annotations.get('strikethrough'): text = f'<s>{text}</s>'
-    if annotations.get('code'): text = f'<code>{text}</code>'
-    return text
-
-def get_cell_style(cell, row_bg=None):
-    if not cell:
-        return ""
-    first = cell[0] if cell else {}
-    annotations = first.get('annotations', {})
-    color = annotations.get('color', 'default')
-    font_weight = 'bold' if annotations.get('bold') else 'normal'
-    font_style = 'italic' if annotations.get('italic') else 'normal'
-    text_color = NOTION_COLOR_MAP.get(color.replace('_background', ''), '#000')
-    if 'background' in color:
-        bg_color = NOTION_BG_MAP.get(color, '#fff')
-    elif row_bg and row_bg != 'default':
-        bg_color = NOTION_BG_MAP.get(row_bg, '#fff')
-    else:
-        bg_color = '#fff'
-    style = f"color:{text_color};background:{bg_color};font-weight:{font_weight};font-style:{font_style};"
-    return style
-
-def get_plain_text_from_cell(cell):
-    return ''.join([t.get('plain_text', '') for t in cell])
-
-def estimate_column_widths_with_pixel_heuristic(table_rows):
-    if not table_rows:
-        return []
-    col_lengths = []
-    max_cols = max(len(row['table_row']['cells']) for row in table_rows) if table_rows else 0
-    if max_cols == 0: return []
-    for col_idx in range(max_cols):
-        max_length = 0
-        for row in table_rows:
-            cells = row['table_row']['cells']
-            if col_idx < len(cells):
-                cell_text = get_plain_text_from_cell(cells[col_idx])
-                line_lengths = [len(line) for line in cell_text.split('\n')]
-                cell_length = max(line_lengths) if line_lengths else 0
-                max_length = max(max_length, cell_length)
-        col_lengths.append(max_length)
-    total_content_length = sum(col_lengths)
-    if total_content_length == 0:
-        return [100 / max_cols] * max_cols if max_cols > 0 else []
-    PIXEL_PER_CHAR = 4
-    MIN_COL_WIDTH_PX = 65
-    estimated_px_widths = [max(MIN_COL_WIDTH_PX, length * PIXEL_PER_CHAR) for length in col_lengths]
-    total_estimated_px_width = sum(estimated_px_widths)
-    if total_estimated_px_width == 0: return [100 / max_cols] * max_cols if max_cols > 0 else []
-    percent_widths = [(px_width / total_estimated_px_width) * 100 for px_width in estimated_px_widths]
-    wrap_cols = set()
-    for col_idx in range(max_cols):
-        for row in table_rows:
-            cells = row['table_row']['cells']
-            if col_idx < len(cells):
-                cell_text = get_plain_text_from_cell(cells[col_idx])
-                if '\n' in cell_text:
-                    wrap_cols.add(col_idx)
-    current_sum = sum(percent_widths)
-    remain = 100 - current_sum
-    if remain > 0 and wrap_cols:
-        add_per_col = remain / len(wrap_cols)
-        for idx in wrap_cols:
-            percent_widths[idx] += add_per_col
-    current_sum2 = sum(percent_widths)
-    if current_sum2 != 100 and percent_widths:
-        diff = 100 - current_sum2
-        percent_widths[0] += diff
-    return percent_widths
-
-async def blocks_to_html(blocks, notion_client):
-    if not blocks:
-        return ""
-    html_parts = []
-    i = 0
-    while i < len(blocks):
-        block = blocks[i]
-        block_type = block['type']
-        if block_type == 'synced_block':
-            synced_children = block.get('children')
-            synced_block_content = await blocks_to_html(synced_children, notion_client) if synced_children else ""
-            html_parts.append(f"<div class='synced-block-container'>{synced_block_content}</div>")
-            i += 1
-            continue
-        if block_type in ['bulleted_list_item', 'numbered_list_item']:
-            list_tag = 'ul' if block_type == 'bulleted_list_item' else 'ol'
-            list_items = []
-            j = i
-            while j < len(blocks) and blocks[j]['type'] == block_type:
-                current_block = blocks[j]
-                item_content = rich_text_to_html(current_block[block_type]['rich_text'])
-                if current_block.get('has_children') and current_block.get('children'):
-                    item_content += await blocks_to_html(current_block['children'], notion_client)
-                list_items.append(f"<li>{item_content}</li>")
-                j += 1
-            html_parts.append(f"<{list_tag}>{''.join(list_items)}</{list_tag}>")
-            i = j
-            continue
-        block_html = ""
-        if block_type == 'heading_1':
-            block_html = f"<h1>{rich_text_to_html(block['heading_1']['rich_text'])}</h1>"
-        elif block_type == 'heading_2':
-            block_html = f"<h2>{rich_text_to_html(block['heading_2']['rich_text'])}</h2>"
-        elif block_type == 'heading_3':
-            block_html = f"<h3>{rich_text_to_html(block['heading_3']['rich_text'])}</h3>"
-        elif block_type == 'paragraph':
-            text = rich_text_to_html(block['paragraph']['rich_text'])
-            block_html = f"<p>{text if text.strip() else ' '}</p>"
-            if block.get('has_children') and block.get('children'):
-                block_html += f"<div style='margin-left: 2em;'>{await blocks_to_html(block['children'], notion_client)}</div>"
-        elif block_type == 'image':
-            image_data = block['image']
-            url = image_data.get('file', {}).get('url') or image_data.get('external', {}).get('url', '')
-            block_html = f"<img src='{url}' alt='Image' class='notion-block-image' style='max-width: 100%; height: auto;'>"
-        elif block_type == 'code':
-            code_text = rich_text_to_html(block['code']['rich_text'])
-            language = block['code'].get('language', '')
-            block_html = f"<pre><code class='language-{language}'>{code_text}</code></pre>"
-        elif block_type == 'divider':
-            block_html = "<hr>"
-        elif block_type == 'quote':
-            block_html = f"<blockquote>{rich_text_to_html(block['quote']['rich_text'])}</blockquote>"
-        elif block_type == 'toggle':
-            summary = rich_text_to_html(block['toggle']['rich_text'])
-            children_html = await blocks_to_html(block['children'], notion_client) if block.get('has_children') and block.get('children') else ""
-            block_html = f"<details open><summary>{summary}</summary>{children_html}</details>"
-        elif block_type == 'table':
-            width_ratios = estimate_column_widths_with_pixel_heuristic(block.get('children', []))
-            colgroup_html = ''.join([f'<col style="width:{ratio:.2f}%">' for ratio in width_ratios]) if width_ratios else ""
-            table_html_content = f"<table><colgroup>{colgroup_html}</colgroup>"
-            if block.get('children'):
-                for i_row, row_block in enumerate(block['children']):
-                    if row_block['type'] == 'table_row':
-                        cells = row_block['table_row']['cells']
-                        row_bg = row_block['table_row'].get('background', 'default')
-                        table_html_content += f"<tr style='background:{NOTION_BG_MAP.get(row_bg, '#fff')}'>"
-                        for col_idx, cell in enumerate(cells):
-                            style = get_cell_style(cell, row_bg=row_bg)
-                            tag = 'th' if (block['table'].get('has_column_header') and i_row == 0) or (block['table'].get('has_row_header') and col_idx == 0) else 'td'
-                            if tag == 'th':
-                                table_html_content += f"<th class='table-header-cell' style='{style}'>{rich_text_to_html(cell)}</th>"
-                            else:
-                                table_html_content += f"<td style='{style}'>{rich_text_to_html(cell)}</td>"
-                        table_html_content += "</tr>"
-            table_html_content += "</table>"
-            block_html = table_html_content
-        elif block_type == 'callout':
-            callout = block['callout']
-            icon_html = f"{callout['icon']['emoji']} " if callout.get('icon') and callout['icon']['type'] == 'emoji' else ""
-            callout_text = rich_text_to_html(callout['rich_text'])
-            children_html = await blocks_to_html(block['children'], notion_client) if block.get('has_children') else ''
-            block_html = f"<div class='callout'>{icon_html}{callout_text}{children_html}</div>"
-        html_parts.append(block_html)
-        i += 1
-    return '\n'.join(html_parts)
-
-async def export_single_pdf(notion_client, page_id, page_index, temp_dir):
-    """단일 페이지의 PDF를 생성합니다."""
-    page_info = await notion_client.pages.retrieve(page_id=page_id)
-    page_title = extract_page_title(page_info)
-    blocks = await fetch_all_child_blocks(notion_client, page_id)
-    content_html = await blocks_to_html(blocks, notion_client)
-    styles = get_styles()
-    
     clean_title = page_title.strip() if page_title else ""
     # 제목이 없거나 'Untitled'면 h1을 출력하지 않음
     if clean_title and clean_title.lower() != "untitled":
         title_section = f'<h1>{clean_title}</h1><div style="height: 0.3em;"></div>'
     else:
         title_section = ""
-    
-    full_html = f"""
+    return clean_title, f"{title_section}\n{content_html}"
+
+async def build_page_content(notion_client, page_id, block_cache=None, resolver=None, asset_cache=None):
+    """페이지 제목과 본문 HTML(제목 h1 포함)을 만듭니다.
+
+    asset_cache가 주어지면 렌더링 전에 페이지의 이미지를 미리 내려받아 둡니다.
+    """
+    page_info, blocks = await fetch_page_blocks(notion_client, page_id, block_cache, resolver, asset_cache)
+    return build_page_html(extract_page_title(page_info), blocks, page_id)
+
+def wrap_html_document(title, body_html):
+    """본문 HTML을 스타일이 포함된 완전한 HTML 문서로 감쌉니다."""
+    styles = get_styles()
+    return f"""
     <!DOCTYPE html>
     <html lang=\"ko\">
     <head>
         <meta charset=\"UTF-8\">
-        <title>{clean_title if clean_title else f'Portfolio_{page_index}'}</title>
+        <title>{title}</title>
         <style>{styles}</style>
     </head>
     <body>
-        {title_section}
-        {content_html}
+        {body_html}
     </body>
     </html>
     """
-    
-    pdf_path = os.path.join(temp_dir, f"My_Portfolio_{page_index}.pdf")
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await page.set_content(full_html, wait_until="networkidle")
-        await page.pdf(path=pdf_path, format="A4", print_background=True)
-        await browser.close()
-    
-    return pdf_path
 
-def merge_pdfs(pdf_paths, output_path):
-    """여러 PDF 파일을 하나로 병합합니다."""
-    if not pdf_paths:
+def page_document(title, body_html, page_index):
+    """한 페이지를 렌더링할 완전한 HTML 문서를 만듭니다."""
+    return wrap_html_document(title if title else f'Portfolio_{page_index}', body_html)
+
+async def render_page_pdf(title, body_html, page_index, browser_pool=None, render_cache=None, page_id=None):
+    """한 페이지를 렌더링해 PDF 바이트를 반환합니다."""
+    return await render_pdf(page_document(title, body_html, page_index), None, browser_pool, render_cache, page_id)
+
+async def export_single_pdf(notion_client, page_id, page_index, browser_pool=None, block_cache=None, resolver=None, render_cache=None, asset_cache=None):
+    """단일 페이지의 PDF를 생성해 바이트로 반환합니다."""
+    title, body_html = await build_page_content(notion_client, page_id, block_cache, resolver, asset_cache)
+    return await render_page_pdf(title, body_html, page_index, browser_pool, render_cache, page_id)
+
+def build_single_document(contents):
+    """(제목, 본문) 목록을 페이지마다 새 용지에서 시작하는 하나의 HTML 문서로 합칩니다."""
+    sections = [f"<section class='portfolio-page'>{body_html}</section>" for _, body_html in contents]
+    first_title = next((title for title, _ in contents if title), 'Portfolio')
+    return wrap_html_document(first_title, '\n'.join(sections))
+
+def merge_pdfs(pdfs, output_path):
+    """여러 PDF(파일 경로, PdfPages 또는 바이트)를 순서대로 하나로 병합합니다."""
+    if not pdfs:
         return None
-    
-    merger = PdfMerger()
-    for pdf in pdf_paths:
-        merger.append(pdf)
-    merger.write(output_path)
-    merger.close()
-    return output_path
-
-async def export_and_merge_pdf(page_ids, output_pdf_path="My_Portfolio_Final.pdf", progress_callback=None):
-    """여러 페이지의 PDF를 생성하고 병합합니다. progress_callback은 (current, total) 인수를 받습니다."""
-    from dotenv import load_dotenv
-    load_dotenv()
-    NOTION_API_KEY = os.getenv("NOTION_API_KEY")
-    notion = AsyncClient(auth=NOTION_API_KEY)
-    
-    temp_dir = TEMP_DIR
-    os.makedirs(temp_dir, exist_ok=True)
-    temp_pdf_paths = []
-    
-    total_pages = len(page_ids)
-    semaphore = asyncio.Semaphore(4)
-    async def export_with_semaphore(page_id, idx):
-        async with semaphore:
+    if all(isinstance(pdf, (str, PdfPages)) for pdf in pdfs):
+        # 파일끼리는 하나씩 읽어 바로 이어 쓰므로 큰 입력(루트별 PDF 등)도 한꺼번에 메모리에 올리지 않습니다.
+        concatenate_pdfs(pdfs, output_path)
+        return output_path
+    merger = OrderedPdfMerger(output_path)
+    for idx, pdf in enumerate(pdfs):
+        merger.add(idx, pdf)
+    return merger.write()
+
+async def export_and_merge_pdf(page_ids, output_pdf_path="My_Portfolio_Final.pdf", progress_callback=None, single_document=False, workers=None, trace_path=None, notion_client=None, stage_callback=None, incremental=False, resume=False):
+    """page_ids의 페이지를 순서대로 PDF로 만들어 하나로 병합하고 출력 경로를 반환합니다.
+
+    페이지는 가져오기(fetch) -> HTML(html) -> 렌더링(render) 단계를 파이프라인으로 지납니다. 페이지별로 렌더링한
+    출력 옆에는 증분 내보내기에 쓰는 매니페스트(페이지 id, last_edited_time, 내용 해시, 쪽 범위)를 남깁니다.
+
+    output_pdf_path: 출력 경로. 기본값이면 config.FINAL_PDF_PATH에 씁니다.
+    progress_callback: (렌더링까지 끝난 페이지 수, 전체 수)를 받습니다.
+    single_document: 모든 페이지를 하나의 HTML 문서로 렌더링합니다. 페이지 수나 HTML 크기가 한도를 넘으면 페이지별로 렌더링합니다.
+    workers: 렌더링을 맡길 프로세스 수(프로세스마다 브라우저 하나). 없으면 현재 프로세스의 브라우저 풀을 씁니다.
+    trace_path: 단계별 구간을 쓸 Chrome trace JSON 경로. 기본값은 config.EXPORT_TRACE_PATH입니다.
+    notion_client: 함께 쓸 클라이언트(와 요청 스케줄러). 없으면 새로 만듭니다.
+    stage_callback: (단계 이름, 완료 수, 전체 수)를 받습니다.
+    incremental: 내용 해시가 이전 출력과 같은 페이지는 렌더링하지 않고 이전 출력의 쪽 범위를 옮겨옵니다.
+    resume: 페이지별 HTML과 PDF를 체크포인트로 남기고, 같은 내보내기의 체크포인트가 있으면 끝난 페이지는 건너뜁니다.
+
+    재시도 후에도 실패한 페이지가 있으면 나머지 페이지로 PDF를 만든 뒤 PageExportError를 던집니다.
+    """
+    async def run():
+        final_pdf_path = FINAL_PDF_PATH if output_pdf_path == "My_Portfolio_Final.pdf" else output_pdf_path
+        async with ExportSession(notion_client, workers) as session:
+            return await session.export(page_ids, final_pdf_path, progress_callback, single_document, stage_callback, incremental, resume)
+    return await _run_traced(run, trace_path)
+
+async def export_each_root(root_groups, output_dir, merged_pdf_path=None, progress_callback=None, single_document=False, workers=None, trace_path=None, notion_client=None, stage_callback=None, incremental=False, resume=False):
+    """루트마다 PDF 하나씩(원하면 전체 병합본도) 한 세션에서 만듭니다.
+
+    root_groups는 (루트 id, 페이지 id 목록) 목록이며, 출력은 output_dir/<루트 제목>_<id 앞 8자리>.pdf(제목을 가져오지 못하면 <루트 id>.pdf)입니다.
+    모든 출력이 클라이언트(요청 스케줄러), 블록/동기화 블록/에셋/렌더 캐시, 브라우저 풀을 함께 쓰므로
+    여러 루트에 재사용된 블록이나 이미지는 한 번만 가져옵니다. merged_pdf_path를 주면 병합본은
+    다시 렌더링하지 않고 루트별 PDF를 이어 붙여 만듭니다. 여러 루트에 함께 속한 페이지는 병합본에
+    처음 나온 한 번만 들어갑니다.
+    progress_callback과 stage_callback은 전체 출력을 합친 페이지 수 기준으로 호출됩니다.
+    나머지 인수는 export_and_merge_pdf와 같고, 반환 값은 만든 PDF 경로 목록(병합본은 마지막)입니다.
+    """
+    async def run():
+        os.makedirs(output_dir, exist_ok=True)
+        grand_total = sum(len(page_ids) for _, page_ids in root_groups)
+        done_pages = 0
+
+        def progress(current, total):
             if progress_callback:
-                progress_callback(idx, total_pages)
-            return await export_single_pdf(notion, page_id, idx, temp_dir)
-    tasks = [export_with_semaphore(page_id, idx) for idx, page_id in enumerate(page_ids)]
-    temp_pdf_paths = await asyncio.gather(*tasks)
-    temp_pdf_paths = [path for path in temp_pdf_paths if isinstance(path, str) and os.path.exists(path)]
-    
-    # 병합 완료 시 진행률 100%
-    if progress_callback:
-        progress_callback(total_pages, total_pages)
-    
-    final_pdf_path = FINAL_PDF_PATH if output_pdf_path == "My_Portfolio_Final.pdf" else output_pdf_path
-    return merge_pdfs(temp_pdf_paths, final_pdf_path) 
\ No newline at end of file
+                progress_callback(done_pages + current, grand_total)
+
+        def stage_progress(stage, completed, total):
+            if stage_callback:
+                stage_callback(stage, done_pages + completed, grand_total)
+
+        outputs = []
+        exported_groups = []
+        failures = {}
+        async with ExportSession(notion_client, workers) as session:
+            for root_id, page_ids in root_groups:
+                output_path = os.path.join(output_dir, await session.root_file_name(root_id))
+                try:
+                    result = await session.export(page_ids, output_path, progress, single_document, stage_progress, incremental, resume)
+                except PageExportError as e:
+                    result = e.output_path
+                    failures.update(e.failures)
+                if result:
+                    outputs.append(result)
+                    exported_groups.append((result, page_ids))
+                done_pages += len(page_ids)
+        if merged_pdf_path and outputs:
+            # 루트별 PDF를 그대로 이어 붙이므로 병합본을 위해 다시 렌더링하지 않습니다.
+            sources = await asyncio.to_thread(unique_page_sources, exported_groups)
+            merged = await asyncio.to_thread(merge_pdfs, sources, merged_pdf_path)
+            if merged:
+                outputs.append(merged)
+        if failures:
+            raise PageExportError(outputs, failures, resume)
+        return outputs
+    return await _run_traced(run, trace_path)
+
+def unique_page_sources(exported_groups):
+    """(루트별 PDF 경로, 페이지 id 목록) 목록에서, 앞선 PDF에 이미 들어간 페이지를 뺀 병합 입력 목록을 만듭니다.
+
+    쪽 범위는 각 PDF의 매니페스트에서 읽습니다. 매니페스트가 없는 PDF(단일 문서로 렌더링한 출력 등)는
+    페이지 경계를 알 수 없으므로 통째로 넣고, 그 루트의 페이지는 모두 들어간 것으로 봅니다.
+    """
+    seen = set()
+    sources = []
+    for path, page_ids in exported_groups:
+        pages = load_manifest(path)
+        if not pages:
+            sources.append(path)
+            seen.update(page_ids)
+            continue
+        keep = []
+        for entry in sorted(pages.values(), key=lambda entry: entry['start']):
+            if entry['page_id'] not in seen:
+                seen.add(entry['page_id'])
+                keep.extend(range(entry['start'], entry['start'] + entry['count']))
+        if len(keep) == sum(entry['count'] for entry in pages.values()):
+            sources.append(path)
+        elif keep:
+            sources.append(PdfPages(path, keep))
+    return sources
+
+async def _run_traced(run, trace_path):
+    trace_path = trace_path or EXPORT_TRACE_PATH
+    if not trace_path:
+        return await run()
+    tracer = tracing.start_tracing()
+    try:
+        with tracer.span('export'):
+            return await run()
+    finally:
+        tracing.stop_tracing()
+        tracer.write_chrome_trace(trace_path)
+        print(tracer.summary())
+        print(f"추적 파일: {trace_path}")
+
+# 파일 이름에 쓸 수 없는 문자
+UNSAFE_FILE_NAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+class ExportSession:
+    """Notion 클라이언트, 캐시, 브라우저 풀을 한 번만 준비해 여러 출력이 함께 쓰게 합니다.
+
+    async with로 열고, export()를 출력마다 부릅니다. 닫을 때 캐시 요약을 출력합니다.
+    """
+
+    def __init__(self, notion_client=None, workers=None):
+        self.notion_client = notion_client
+        self.workers = workers
+        self.notion = None
+        self.asset_cache = None
+        self.block_cache = None
+        self.render_cache = None
+        self.resolver = None
+        self.browser_pool = None
+
+    async def __aenter__(self):
+        from dotenv import load_dotenv
+        load_dotenv()
+        self.notion = self.notion_client or create_notion_client()
+        self.asset_cache = AssetCache()
+        self.block_cache = BlockCache(asset_cache=self.asset_cache)
+        self.render_cache = RenderCache()
+        # 여러 페이지(와 여러 출력)에 재사용된 동기화 블록은 세션 동안 한 번만 조회합니다.
+        self.resolver = BlockResolver(self.notion)
+        try:
+            # 브라우저는 한 번만 띄우고 모든 페이지가 공유합니다.
+            if self.workers:
+                render_pool = ProcessRenderPool(self.workers)
+            else:
+                render_pool = BrowserPool(size=EXPORT_RENDER_WORKERS, asset_cache=self.asset_cache)
+            self.browser_pool = await render_pool.start()
+        except BaseException:
+            await self._close_caches()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self.browser_pool.close()
+        finally:
+            await self._close_caches()
+
+    async def _close_caches(self):
+        print(self.block_cache.summary())
+        print(self.render_cache.summary())
+        print(self.asset_cache.summary())
+        self.block_cache.close()
+        await self.asset_cache.close()
+
+    async def root_file_name(self, root_id):
+        """루트 페이지 제목으로 출력 파일 이름을 만듭니다. 제목을 가져오지 못하면 루트 id를 씁니다."""
+        try:
+            title = extract_page_title(await self.notion.pages.retrieve(page_id=root_id))
+        except Exception as e:
+            # 한 루트의 제목 조회 실패로 다른 루트의 출력까지 멈추지 않게 합니다.
+            print(f"루트 페이지 제목 가져오기 오류 ({root_id}): {e}")
+            return f"{root_id.replace('-', '')}.pdf"
+        safe_title = UNSAFE_FILE_NAME.sub('_', title).strip('._') or 'Untitled'
+        return f"{safe_title}_{root_id.replace('-', '')[:8]}.pdf"
+
+    async def export(self, page_ids, final_pdf_path, progress_callback=None, single_document=False, stage_callback=None, incremental=False, resume=False):
+        """page_ids로 final_pdf_path 하나를 만듭니다. 인수는 export_and_merge_pdf와 같습니다."""
+        notion = self.notion
+        block_cache = self.block_cache
+        render_cache = self.render_cache
+        asset_cache = self.asset_cache
+        resolver = self.resolver
+        browser_pool = self.browser_pool
+        os.makedirs(os.path.dirname(final_pdf_path) or '.', exist_ok=True)
+
+        # 페이지별 PDF는 메모리에 두고, 한도를 넘는 분량만 이번 실행 전용 임시 디렉터리에 씁니다.
+        spool = PdfSpool()
+        merger = None
+        total_pages = len(page_ids)
+        render_workers = self.workers or EXPORT_RENDER_WORKERS
+        checkpoint = ExportCheckpoint(final_pdf_path, page_ids).open() if resume else None
+        # 증분 모드: 이전 출력의 매니페스트와 PDF. 다음 실행을 위해 이번 출력의 페이지 정보도 모읍니다.
+        previous_pages = load_manifest(final_pdf_path) if incremental else {}
+        previous_pdf = None
+        if previous_pages:
+            from PyPDF2 import PdfReader
+            previous_pdf = await asyncio.to_thread(PdfReader, final_pdf_path)
+        page_records = {}
+        reused_pages = 0
+        failures = {}
+
+        def on_stage_done(stage, completed, total):
+            if stage_callback:
+                stage_callback(stage, completed, total)
+            if stage == 'render' and progress_callback:
+                progress_callback(completed, total)
+
+        async def on_page_failed(idx, stage, error):
+            # 실패한 페이지는 병합 순서에서 건너뛰고 나머지 페이지는 계속 진행합니다.
+            print(f"페이지 내보내기 실패 ({page_ids[idx]}, {stage}): {error}")
+            failures[page_ids[idx]] = error
+            if merger is not None:
+                await asyncio.to_thread(merger.add, idx, None)
+
+        def pipeline(stages):
+            return StagedPipeline(stages, progress_callback=on_stage_done, retries=EXPORT_PAGE_RETRIES, failure_callback=on_page_failed)
+
+        async def fetch_stage(page_id, idx):
+            if checkpoint is not None and page_id in checkpoint.fetched:
+                return page_id, None
+            return page_id, await fetch_page_blocks(notion, page_id, block_cache, resolver, asset_cache)
+
+        async def html_stage(fetched, idx):
+            page_id, fetched = fetched
+            if fetched is None:
+                return (page_id, *checkpoint.content(page_id))
+            page_info, blocks = fetched
+            last_edited_time = page_info.get('last_edited_time')
+            content = build_page_html(extract_page_title(page_info), blocks, page_id)
+            if checkpoint is not None:
+                checkpoint.record_fetched(page_id, last_edited_time, content)
+            return page_id, last_edited_time, content
+
+        async def render_stage(built, idx):
+            nonlocal reused_pages
+            if built is None:
+                # 앞 단계에서 실패해 이미 보고된 페이지는 병합 순서에서 건너뜁니다.
+                return None
+            page_id, last_edited_time, (title, body_html) = built
+            if checkpoint is not None and page_id in checkpoint.rendered:
+                page_records[idx] = {'page_id': page_id, **checkpoint.rendered[page_id]}
+                return checkpoint.pdf_path(page_id)
+            full_html = page_document(title, body_html, idx)
+            content_hash = RenderCache.key(full_html, PDF_OPTIONS)
+            page_records[idx] = {'page_id': page_id, 'last_edited_time': last_edited_time, 'hash': content_hash}
+            previous = previous_pages.get(page_id)
+            if previous is not None and previous['hash'] == content_hash:
+                # 내용이 그대로인 페이지는 이전 출력의 쪽 범위를 옮겨 붙입니다.
+                reused_pages += 1
+                return PageRange(previous_pdf, previous['start'], previous['start'] + previous['count'])
+            data = await render_pdf(full_html, None, browser_pool, render_cache, page_id, content_hash)
+            if checkpoint is not None:
+                return checkpoint.record_rendered(page_id, data, last_edited_time, content_hash)
+            return spool.add(data, f"My_Portfolio_{idx}")
+
+        async def merge_stage(entry, idx):
+            # 다음 순서의 페이지가 오면 바로 붙입니다. PyPDF2 작업이 이벤트 루프를 막지 않도록 스레드에서 돌립니다.
+            await asyncio.to_thread(merger.add, idx, entry)
+
+        content_stages = [('fetch', EXPORT_FETCH_WORKERS, fetch_stage), ('html', EXPORT_HTML_WORKERS, html_stage)]
+        render_stages = [('render', render_workers, render_stage), ('merge', 1, merge_stage)]
+        try:
+            if single_document and total_pages <= SINGLE_DOCUMENT_MAX_PAGES:
+                built = await pipeline(content_stages).run(page_ids)
+                full_html = build_single_document([item[2] for item in built if item is not None])
+                if len(full_html.encode('utf-8')) <= SINGLE_DOCUMENT_MAX_HTML_BYTES:
+                    result = await render_pdf(full_html, final_pdf_path, browser_pool, render_cache)
+                    if progress_callback:
+                        progress_callback(total_pages, total_pages)
+                    return finish_export(result, failures, checkpoint)
+                print("단일 문서가 너무 커서 페이지별 렌더링으로 전환합니다.")
+                merger = OrderedPdfMerger(final_pdf_path, release=spool.release)
+                await pipeline(render_stages).run(built)
+            else:
+                # API 조회(I/O, 요청 한도), 렌더링(CPU/메모리), 병합이 각자의 워커 수로 동시에 돌아갑니다.
+                merger = OrderedPdfMerger(final_pdf_path, release=spool.release)
+                await pipeline(content_stages + render_stages).run(page_ids)
+            result = await asyncio.to_thread(merger.write)
+            failures.update((page_records[idx]['page_id'], error) for idx, error in merger.failed.items())
+            if result:
+                save_manifest(result, [{**record, 'start': merger.page_ranges[idx][0], 'count': merger.page_ranges[idx][1]}
+                                       for idx, record in sorted(page_records.items()) if idx in merger.page_ranges])
+            # 병합 완료 시 진행률 100%
+            if progress_callback:
+                progress_callback(total_pages, total_pages)
+            return finish_export(result, failures, checkpoint)
+        finally:
+            if merger is not None:
+                print(spool.summary())
+                print(f"병합: 순서를 기다린 페이지 최대 {merger.max_pending}개, 조각 파일 {merger.segment_count}개")
+                merger.close()
+                if incremental:
+                    print(f"증분 내보내기: 재사용 {reused_pages}개 / 다시 렌더링 {len(page_records) - reused_pages}개")
+            spool.close()
+            if checkpoint is not None:
+                checkpoint.close()
+
+def finish_export(result, failures, checkpoint):
+    """실패한 페이지가 없으면 체크포인트를 지우고 결과를 반환합니다. 있으면 체크포인트를 남기고 PageExportError를 던집니다."""
+    if failures:
+        raise PageExportError(result, failures, checkpoint is not None)
+    if checkpoint is not None:
+        checkpoint.clear()
+    return result
@@ -0,0 +1,267 @@
+from array import array
+from functools import lru_cache
+from asset_cache import image_url
+
+NOTION_COLOR_MAP = {
+    'default': '#000000',
+    'gray': '#787774',
+    'brown': '#9F6B53',
+    'orange': '#D9730D',
+    'yellow': '#CB912F',
+    'green': '#448361',
+    'blue': '#337EA9',
+    'purple': '#9065B0',
+    'pink': '#C14C8A',
+    'red': '#D44C47'
+}
+NOTION_BG_MAP = {
+    'default': '#FFFFFF',
+    'gray_background': '#F1F1EF',
+    'brown_background': '#F4EEEE',
+    'orange_background': '#FAEBDD',
+    'yellow_background': '#FBF3DB',
+    'green_background': '#EDF3EC',
+    'blue_background': '#E7F3F8',
+    'purple_background': '#F6F3F9',
+    'pink_background': '#FAF1F5',
+    'red_background': '#FDEBEC'
+}
+
+# 블록 타입 -> 렌더러 함수 (block) -> str
+BLOCK_RENDERERS = {}
+LIST_BLOCK_TAGS = {'bulleted_list_item': 'ul', 'numbered_list_item': 'ol'}
+
+def register_block_renderer(*block_types):
+    """블록 타입에 대한 HTML 렌더러를 등록합니다. 이미 있으면 교체합니다."""
+    def decorator(func):
+        for block_type in block_types:
+            BLOCK_RENDERERS[block_type] = func
+        return func
+    return decorator
+
+def rich_text_to_html(rich_text_array, process_nested_bullets=False):
+    if not rich_text_array:
+        return ""
+    parts = []
+    for chunk in rich_text_array:
+        href = chunk.get("href")
+        text = chunk.get('plain_text', '').replace('\n', '<br>')
+        if href:
+            parts.append(f'<a href="{href}" target="_blank">{text}</a>')
+        else:
+            parts.append(apply_annotations(text, chunk))
+    return ''.join(parts)
+
+def apply_annotations(text, chunk):
+    if not text:
+        return ""
+    href = chunk.get('href')
+    if href:
+        return f'<a href="{href}">{text}</a>'
+    annotations = chunk.get('annotations', {})
+    if annotations.get('bold'): text = f'<strong>{text}</strong>'
+    if annotations.get('italic'): text = f'<em>{text}</em>'
+    if annotations.get('underline'): text = f'<u>{text}</u>'
+    if annotations.get('strikethrough'): text = f'<s>{text}</s>'
+    if annotations.get('code'): text = f'<code>{text}</code>'
+    return text
+
+def get_cell_style(cell, row_bg=None):
+    if not cell:
+        return ""
+    annotations = cell[0].get('annotations', {})
+    return cell_style(annotations.get('color', 'default'), bool(annotations.get('bold')), bool(annotations.get('italic')), row_bg)
+
+@lru_cache(maxsize=1024)
+def cell_style(color, bold, italic, row_bg):
+    """셀 스타일 조합은 몇 가지뿐이므로 문자열을 한 번만 만듭니다."""
+    font_weight = 'bold' if bold else 'normal'
+    font_style = 'italic' if italic else 'normal'
+    text_color = NOTION_COLOR_MAP.get(color.replace('_background', ''), '#000')
+    if 'background' in color:
+        bg_color = NOTION_BG_MAP.get(color, '#fff')
+    elif row_bg and row_bg != 'default':
+        bg_color = NOTION_BG_MAP.get(row_bg, '#fff')
+    else:
+        bg_color = '#fff'
+    style = f"color:{text_color};background:{bg_color};font-weight:{font_weight};font-style:{font_style};"
+    return style
+
+def get_plain_text_from_cell(cell):
+    return ''.join([t.get('plain_text', '') for t in cell])
+
+PIXEL_PER_CHAR = 4
+MIN_COL_WIDTH_PX = 65
+
+def measure_table_columns(table_rows):
+    """모든 셀을 한 번씩만 훑어 열별 최대 줄 길이와 줄바꿈 포함 여부를 구합니다.
+
+    반환값은 열 기준 배열 (col_lengths: array('l'), wrap: bytearray) 입니다.
+    """
+    max_cols = max((len(row['table_row']['cells']) for row in table_rows), default=0)
+    col_lengths = array('l', bytes(array('l').itemsize * max_cols))
+    wrap = bytearray(max_cols)
+    for row in table_rows:
+        for col_idx, cell in enumerate(row['table_row']['cells']):
+            cell_text = get_plain_text_from_cell(cell)
+            if '\n' in cell_text:
+                wrap[col_idx] = 1
+                cell_length = max(len(line) for line in cell_text.split('\n'))
+            else:
+                cell_length = len(cell_text)
+            if cell_length > col_lengths[col_idx]:
+                col_lengths[col_idx] = cell_length
+    return col_lengths, wrap
+
+def column_widths_from_measure(col_lengths, wrap):
+    """열 길이로 퍼센트 너비를 계산합니다. 줄바꿈이 있는 열에 남는 폭을 나눠줍니다."""
+    max_cols = len(col_lengths)
+    if max_cols == 0:
+        return []
+    if sum(col_lengths) == 0:
+        return [100 / max_cols] * max_cols
+    estimated_px_widths = [max(MIN_COL_WIDTH_PX, length * PIXEL_PER_CHAR) for length in col_lengths]
+    total_estimated_px_width = sum(estimated_px_widths)
+    percent_widths = [(px_width / total_estimated_px_width) * 100 for px_width in estimated_px_widths]
+    wrap_cols = [idx for idx in range(max_cols) if wrap[idx]]
+    remain = 100 - sum(percent_widths)
+    if remain > 0 and wrap_cols:
+        add_per_col = remain / len(wrap_cols)
+        for idx in wrap_cols:
+            percent_widths[idx] += add_per_col
+    current_sum = sum(percent_widths)
+    if current_sum != 100:
+        percent_widths[0] += 100 - current_sum
+    return percent_widths
+
+def estimate_column_widths_with_pixel_heuristic(table_rows):
+    if not table_rows:
+        return []
+    return column_widths_from_measure(*measure_table_columns(table_rows))
+
+def render_blocks(blocks):
+    """블록 목록을 HTML로 변환합니다. 연속된 목록 블록은 하나의 ul/ol로 묶습니다."""
+    if not blocks:
+        return ""
+    html_parts = []
+    i = 0
+    while i < len(blocks):
+        block_type = blocks[i]['type']
+        list_tag = LIST_BLOCK_TAGS.get(block_type)
+        if list_tag:
+            list_items = []
+            while i < len(blocks) and blocks[i]['type'] == block_type:
+                current_block = blocks[i]
+                item_content = rich_text_to_html(current_block[block_type]['rich_text'])
+                if current_block.get('has_children') and current_block.get('children'):
+                    item_content += render_blocks(current_block['children'])
+                list_items.append(f"<li>{item_content}</li>")
+                i += 1
+            html_parts.append(f"<{list_tag}>{''.join(list_items)}</{list_tag}>")
+            continue
+        renderer = BLOCK_RENDERERS.get(block_type)
+        # 지원하지 않는 블록은 기존과 같이 빈 항목으로 남깁니다.
+        html_parts.append(renderer(blocks[i]) if renderer else "")
+        i += 1
+    return '\n'.join(html_parts)
+
+def render_children(block):
+    return render_blocks(block['children']) if block.get('has_children') and block.get('children') else ""
+
+@register_block_renderer('synced_block')
+def render_synced_block(block):
+    synced_children = block.get('children')
+    synced_block_content = render_blocks(synced_children) if synced_children else ""
+    return f"<div class='synced-block-container'>{synced_block_content}</div>"
+
+@register_block_renderer('heading_1', 'heading_2', 'heading_3')
+def render_heading(block):
+    level = block['type'][-1]
+    return f"<h{level}>{rich_text_to_html(block[block['type']]['rich_text'])}</h{level}>"
+
+@register_block_renderer('paragraph')
+def render_paragraph(block):
+    text = rich_text_to_html(block['paragraph']['rich_text'])
+    block_html = f"<p>{text if text.strip() else ' '}</p>"
+    if block.get('has_children') and block.get('children'):
+        block_html += f"<div style='margin-left: 2em;'>{render_blocks(block['children'])}</div>"
+    return block_html
+
+@register_block_renderer('image')
+def render_image(block):
+    url = image_url(block)
+    return f"<img src='{url}' alt='Image' class='notion-block-image' style='max-width: 100%; height: auto;'>"
+
+@register_block_renderer('code')
+def render_code(block):
+    code_text = rich_text_to_html(block['code']['rich_text'])
+    language = block['code'].get('language', '')
+    return f"<pre><code class='language-{language}'>{code_text}</code></pre>"
+
+@register_block_renderer('divider')
+def render_divider(block):
+    return "<hr>"
+
+@register_block_renderer('quote')
+def render_quote(block):
+    return f"<blockquote>{rich_text_to_html(block['quote']['rich_text'])}</blockquote>"
+
+@register_block_renderer('toggle')
+def render_toggle(block):
+    summary = rich_text_to_html(block['toggle']['rich_text'])
+    return f"<details open><summary>{summary}</summary>{render_children(block)}</details>"
+
+@register_block_renderer('table')
+def render_table(block):
+    rows = block.get('children', [])
+    width_ratios = estimate_column_widths_with_pixel_heuristic(rows)
+    colgroup_html = ''.join([f'<col style="width:{ratio:.2f}%">' for ratio in width_ratios]) if width_ratios else ""
+    parts = [f"<table><colgroup>{colgroup_html}</colgroup>"]
+    has_column_header = block['table'].get('has_column_header')
+    has_row_header = block['table'].get('has_row_header')
+    for i_row, row_block in enumerate(rows):
+        if row_block['type'] != 'table_row':
+            continue
+        cells = row_block['table_row']['cells']
+        row_bg = row_block['table_row'].get('background', 'default')
+        parts.append(f"<tr style='background:{NOTION_BG_MAP.get(row_bg, '#fff')}'>")
+        for col_idx, cell in enumerate(cells):
+            style = get_cell_style(cell, row_bg=row_bg)
+            if (has_column_header and i_row == 0) or (has_row_header and col_idx == 0):
+                parts.append(f"<th class='table-header-cell' style='{style}'>{rich_text_to_html(cell)}</th>")
+            else:
+                parts.append(f"<td style='{style}'>{rich_text_to_html(cell)}</td>")
+        parts.append("</tr>")
+    parts.append("</table>")
+    return ''.join(parts)
+
+@register_block_renderer('callout')
+def render_callout(block):
+    callout = block['callout']
+    icon_html = f"{callout['icon']['emoji']} " if callout.get('icon') and callout['icon']['type'] == 'emoji' else ""
+    callout_text = rich_text_to_html(callout['rich_text'])
+    return f"<div class='callout'>{icon_html}{callout_text}{render_children(block)}</div>"
+
+@register_block_renderer('to_do')
+def render_to_do(block):
+    to_do = block['to_do']
+    checked = ' checked' if to_do.get('checked') else ''
+    text = rich_text_to_html(to_do['rich_text'])
+    return (f"<div class='to-do{checked}'><input type='checkbox' disabled{checked}> "
+            f"<span>{text}</span>{render_children(block)}</div>")
+
+@register_block_renderer('bookmark', 'link_preview', 'embed')
+def render_bookmark(block):
+    data = block[block['type']]
+    url = data.get('url', '')
+    caption = rich_text_to_html(data.get('caption', []))
+    return f"<div class='bookmark'><a href=\"{url}\" target=\"_blank\">{caption or url}</a></div>"
+
+@register_block_renderer('column_list')
+def render_column_list(block):
+    columns = [f"<div class='column'>{render_children(column)}</div>" for column in block.get('children', []) if column['type'] == 'column']
+    return f"<div class='column-list'>{''.join(columns)}</div>"
+
+@register_block_renderer('equation')
+def render_equation(block):
+    return f"<div class='equation'><code>{block['equation'].get('expression', '')}</code></div>"
@@ -1,68 +1,143 @@
 import sys
-import os
 import asyncio
 import time
 from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QListWidgetItem, QLabel, QMessageBox, QProgressBar
-from PySide6.QtCore import Qt, QThread, Signal, Slot
-from notion_client import AsyncClient
-from exporter import export_and_merge_pdf
-from notion_api import get_root_pages, get_first_child_page_ids
-from config import FINAL_PDF_NAME
-from utils import extract_page_title
+from PySide6.QtCore import Qt, QThread, QTimer, Signal, Slot
+from config import FINAL_PDF_NAME, FINAL_PDF_PATH, WORKSPACE_SNAPSHOT_PATH
+
+# 창이 뜨기 전에 notion_client, playwright, PyPDF2를 불러오지 않도록
+# notion_api/exporter는 쓰는 곳(작업 스레드)에서 가져옵니다.
+
+# 내보내기 파이프라인 단계 이름 -> 화면에 보여줄 이름
+STAGE_LABELS = {'fetch': '가져오기', 'html': 'HTML', 'render': '렌더링', 'merge': '병합'}
+
+def format_stage_progress(stage_counts, total_pages):
+    """단계별 완료 페이지 수를 '가져오기 12 · HTML 11 · 렌더링 8 · 병합 6 / 30' 형태로 만듭니다."""
+    counts = ' · '.join(f"{STAGE_LABELS.get(stage, stage)} {count}" for stage, count in stage_counts.items())
+    return f"{counts} / {total_pages}"
+
+class WarmUpThread(QThread):
+    """창이 뜬 뒤 내보내기에 필요한 무거운 모듈을 미리 불러와 첫 내보내기 지연을 줄입니다."""
+
+    def run(self):
+        try:
+            import exporter  # noqa: F401
+        except Exception as e:
+            print(f"모듈 미리 불러오기 실패: {e}")
 
 class LoadPagesThread(QThread):
-    pages_loaded = Signal(list, list)
+    """저장된 스냅샷을 먼저 보내고, search 응답이 올 때마다 루트 목록의 변화를 보낸 뒤 완성된 WorkspaceIndex를 보냅니다."""
+    # ([(페이지 id, 제목), ...] 새로 보이거나 바뀐 루트, [페이지 id, ...] 루트에서 빠진 페이지, 지금까지 읽은 페이지 수)
+    roots_changed = Signal(list, list, int)
+    pages_loaded = Signal(object)
     error = Signal(str)
 
+    async def load(self):
+        from notion_api import get_root_pages
+        workspace_index = None
+        async for workspace_index, added, removed in get_root_pages(WORKSPACE_SNAPSHOT_PATH):
+            # 인덱스는 이 스레드에서 계속 바뀌므로 GUI에는 제목까지 계산한 값만 넘깁니다.
+            self.roots_changed.emit([(page_id, workspace_index.title(page_id)) for page_id in added], removed, len(workspace_index))
+        return workspace_index
+
     def run(self):
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            root_pages, all_pages = loop.run_until_complete(get_root_pages())
-            self.pages_loaded.emit(root_pages, all_pages)
+            workspace_index = loop.run_until_complete(self.load())
+            self.pages_loaded.emit(workspace_index)
         except Exception as e:
             self.error.emit(str(e))
 
 class ExportPDFThread(QThread):
+    """선택한 루트의 하위 페이지 탐색부터 PDF 병합까지 작업 스레드에서 처리합니다.
+
+    output_dir를 주면 루트마다 PDF를 하나씩 그 디렉터리에 만들고, include_merged면 병합본도 만듭니다.
+    이때 finished의 결과는 만든 경로를 줄바꿈으로 이은 문자열입니다.
+    """
+    discovered = Signal(int, int)
     progress = Signal(int, int)
+    # (단계 이름, 그 단계를 마친 페이지 수, 전체 페이지 수)
+    stage_progress = Signal(str, int, int)
     finished = Signal(str, float)
+    no_pages = Signal()
     error = Signal(str)
 
-    def __init__(self, page_ids_unique, final_pdf_name):
+    def __init__(self, root_ids, final_pdf_name, output_dir=None, include_merged=True):
         super().__init__()
-        self.page_ids_unique = page_ids_unique
+        self.root_ids = root_ids
         self.final_pdf_name = final_pdf_name
+        self.output_dir = output_dir
+        self.include_merged = include_merged
+
+    async def export(self):
+        from dotenv import load_dotenv
+        from exporter import export_and_merge_pdf, export_each_root
+        from notion_api import collect_export_page_groups, create_notion_client
+        load_dotenv()
+        # 하위 페이지 탐색과 내보내기가 하나의 클라이언트(요청 스케줄러)를 공유합니다.
+        notion_client = create_notion_client()
+        expanded_roots = 0
+        found_pages = 0
+        def on_root_expanded(root_id, page_ids):
+            nonlocal expanded_roots, found_pages
+            expanded_roots += 1
+            found_pages += len(page_ids)
+            self.discovered.emit(expanded_roots, found_pages)
+        page_groups = await collect_export_page_groups(self.root_ids, notion_client, on_root_expanded)
+        page_ids = list(dict.fromkeys(page_id for _, page_ids in page_groups for page_id in page_ids))
+        if not page_ids:
+            return page_ids, None
+        def progress_callback(current, total_pages):
+            self.progress.emit(current, total_pages)
+        def stage_callback(stage, completed, total_pages):
+            self.stage_progress.emit(stage, completed, total_pages)
+        if self.output_dir:
+            # 루트별 PDF와 병합본이 한 세션(클라이언트, 캐시, 브라우저)을 함께 씁니다.
+            merged_pdf_path = FINAL_PDF_PATH if self.include_merged else None
+            outputs = await export_each_root(page_groups, self.output_dir, merged_pdf_path, progress_callback,
+                                             notion_client=notion_client, stage_callback=stage_callback)
+            return page_ids, '\n'.join(outputs)
+        return page_ids, await export_and_merge_pdf(page_ids, self.final_pdf_name, progress_callback, notion_client=notion_client, stage_callback=stage_callback)
 
     def run(self):
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             start_time = time.time()
-            def progress_callback(current, total_pages):
-                self.progress.emit(current, total_pages)
-            result = loop.run_until_complete(export_and_merge_pdf(self.page_ids_unique, self.final_pdf_name, progress_callback))
+            page_ids, result = loop.run_until_complete(self.export())
+            if not page_ids:
+                self.no_pages.emit()
+                return
             elapsed = time.time() - start_time
             self.finished.emit(result, elapsed)
         except Exception as e:
             self.error.emit(str(e))
 
 class MainWindow(QMainWindow):
+    # 목록 위 라벨의 기본 문구. 고급 UI 등 하위 클래스가 바꿉니다.
+    LIST_LABEL = "목록:"
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Notion PDF Exporter")
         self.setMinimumSize(600, 400)
-        self.root_pages = []
-        self.all_pages = []
+        self.workspace_index = None
+        self.root_items = {}
+        self.warm_up_thread = WarmUpThread()
         self.init_ui()
         self.load_pages_thread = None
         self.export_pdf_thread = None
+        self.stage_counts = {}
         self.load_pages()
+        # 이벤트 루프가 돌기 시작한 뒤(창이 뜬 뒤) 미리 불러오기를 시작합니다.
+        QTimer.singleShot(0, self.warm_up_thread.start)
 
     def init_ui(self):
         central = QWidget()
         self.setCentralWidget(central)
         layout = QVBoxLayout(central)
-        self.label = QLabel("목록:")
+        self.label = QLabel(self.LIST_LABEL)
         layout.addWidget(self.label)
         self.list_widget = QListWidget()
         self.list_widget.setSelectionMode(QListWidget.MultiSelection)
@@ -85,22 +160,39 @@ class MainWindow(QMainWindow):
     def load_pages(self):
         self.label.setText("페이지 불러오는 중...")
         self.set_buttons_enabled(False)
+        self.list_widget.clear()
+        self.root_items = {}
         self.load_pages_thread = LoadPagesThread()
+        self.load_pages_thread.roots_changed.connect(self.on_roots_changed)
         self.load_pages_thread.pages_loaded.connect(self.on_pages_loaded)
         self.load_pages_thread.error.connect(self.on_load_pages_error)
         self.load_pages_thread.start()
 
-    @Slot(list, list)
-    def on_pages_loaded(self, root_pages, all_pages):
-        self.root_pages = root_pages
-        self.all_pages = all_pages
-        self.list_widget.clear()
-        for page in root_pages:
-            title = extract_page_title(page)
-            item = QListWidgetItem(title)
-            item.setData(Qt.UserRole, page['id'])
+    @Slot(list, list, int)
+    def on_roots_changed(self, added, removed, loaded_count):
+        # 부모 페이지가 뒤늦게 도착해 더 이상 루트가 아닌 페이지는 목록에서 뺍니다.
+        for page_id in removed:
+            item = self.root_items.pop(page_id, None)
+            if item is not None:
+                self.list_widget.takeItem(self.list_widget.row(item))
+        for page_id, title in added:
+            if page_id in self.root_items:
+                self.root_items[page_id].setText(self.item_text(page_id, title))
+                continue
+            item = QListWidgetItem(self.item_text(page_id, title))
+            item.setData(Qt.UserRole, page_id)
             self.list_widget.addItem(item)
-        self.label.setText("목록:")
+            self.root_items[page_id] = item
+        self.label.setText(f"페이지 불러오는 중... ({loaded_count}개 읽음)")
+
+    def item_text(self, page_id, title):
+        """목록에 보여줄 루트 페이지 이름입니다."""
+        return title
+
+    @Slot(object)
+    def on_pages_loaded(self, workspace_index):
+        self.workspace_index = workspace_index
+        self.label.setText(self.LIST_LABEL)
         self.set_buttons_enabled(True)
 
     @Slot(str)
@@ -119,7 +211,9 @@ class MainWindow(QMainWindow):
         if exporting:
             self.label.setText("PDF 생성 중...")
         else:
-            self.label.setText("목록:")
+            self.label.setText(self.LIST_LABEL)
+            if self.progress_bar.maximum() == 0:
+                self.progress_bar.setMaximum(1)
 
     @Slot(str, float)
     def show_export_result(self, result, elapsed=None):
@@ -138,13 +232,32 @@ class MainWindow(QMainWindow):
             self.label.setText("PDF 생성 실패" + (f" (총 {elapsed:.2f}초)" if elapsed is not None else ""))
         self.set_exporting_state(False)
 
+    @Slot(int, int)
+    def update_discovery(self, expanded_roots, found_pages):
+        total_roots = len(self.export_pdf_thread.root_ids) if self.export_pdf_thread else expanded_roots
+        self.label.setText(f"하위 페이지 찾는 중... ({expanded_roots}/{total_roots}, {found_pages}개 발견)")
+
+    @Slot()
+    def on_no_pages(self):
+        QMessageBox.warning(self, "경고", "출력할 페이지가 없습니다.")
+        self.set_exporting_state(False)
+
     @Slot(int, int)
     def update_progress(self, current, total_pages):
+        self.progress_bar.setMaximum(total_pages)
         self.progress_bar.setValue(current)
         percent = int((current / total_pages) * 100) if total_pages > 0 else 0
-        self.label.setText(f"PDF 생성 중... {percent}% ({current}/{total_pages})")
+        self.label.setText(f"PDF 생성 중... {percent}% ({format_stage_progress(self.stage_counts, total_pages)})")
         QApplication.processEvents()
 
+    @Slot(str, int, int)
+    def update_stage_progress(self, stage, completed, total_pages):
+        self.stage_counts[stage] = completed
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setMaximum(total_pages)
+        percent = int((self.progress_bar.value() / total_pages) * 100) if total_pages > 0 else 0
+        self.label.setText(f"PDF 생성 중... {percent}% ({format_stage_progress(self.stage_counts, total_pages)})")
+
     @Slot(str)
     def on_export_error(self, msg):
         QMessageBox.critical(self, "오류", f"PDF 생성 실패: {msg}")
@@ -157,39 +270,28 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "경고", "최소 하나의 페이지를 선택하세요.")
             return
 
-        page_ids = []
-        notion_client = AsyncClient(auth=os.getenv("NOTION_API_KEY"))
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        for item in selected_items:
-            page_id = item.data(Qt.UserRole)
-            first_child_ids = loop.run_until_complete(get_first_child_page_ids(page_id, notion_client))
-            if first_child_ids:
-                page_ids.extend(first_child_ids)
-            else:
-                # 하위 페이지가 없으면 선택한 페이지 자체를 추가
-                page_ids.append(page_id)
-
-        page_ids_unique = list(dict.fromkeys(page_ids))
-        total = len(page_ids_unique)
-
-        if total == 0:
-            QMessageBox.warning(self, "경고", "출력할 페이지가 없습니다.")
-            return
+        root_ids = [item.data(Qt.UserRole) for item in selected_items]
 
         self.set_exporting_state(True)
-        self.progress_bar.setMaximum(total)
+        # 하위 페이지 수를 알기 전까지는 진행률 막대를 '작업 중' 표시로 둡니다.
+        self.progress_bar.setMaximum(0)
         self.progress_bar.setValue(0)
-        QApplication.processEvents()
+        self.label.setText("하위 페이지 찾는 중...")
+        self.stage_counts = {}
 
-        self.export_pdf_thread = ExportPDFThread(page_ids_unique, FINAL_PDF_NAME)
+        self.export_pdf_thread = self.create_export_thread(root_ids)
+        self.export_pdf_thread.discovered.connect(self.update_discovery)
+        self.export_pdf_thread.no_pages.connect(self.on_no_pages)
         self.export_pdf_thread.progress.connect(self.update_progress)
+        self.export_pdf_thread.stage_progress.connect(self.update_stage_progress)
         self.export_pdf_thread.finished.connect(self.show_export_result)
         self.export_pdf_thread.error.connect(self.on_export_error)
         self.export_pdf_thread.start()
 
+    def create_export_thread(self, root_ids):
+        """선택한 루트를 내보낼 작업 스레드를 만듭니다."""
+        return ExportPDFThread(root_ids, FINAL_PDF_NAME)
+
 def main():
     app = QApplication(sys.argv)
     window = MainWindow()
@@ -1,107 +1,351 @@
 import os
-from notion_client import AsyncClient
+import copy
+import time
+import asyncio
+from config import FETCH_CONCURRENCY, WORKSPACE_FULL_SYNC_INTERVAL
+from scheduler import ScheduledAsyncClient, request_priority, is_retryable, PRIORITY_CHILDREN
+from workspace_index import WorkspaceIndex, load_snapshot, save_snapshot
+import tracing
 
-async def get_root_pages():
-    NOTION_API_KEY = os.getenv("NOTION_API_KEY")
-    notion = AsyncClient(auth=NOTION_API_KEY)
-    all_pages = []
+async def iter_search_pages(notion, sort=None):
+    """search 응답이 도착할 때마다 그 페이지 목록을 내보냅니다."""
+    options = {'sort': sort} if sort else {}
     start_cursor = None
     while True:
-        response = await notion.search(filter={"property": "object", "value": "page"}, page_size=100, start_cursor=start_cursor)
-        all_pages.extend(response.get("results", []))
+        response = await notion.search(filter={"property": "object", "value": "page"}, page_size=100, start_cursor=start_cursor, **options)
+        yield response.get("results", [])
         start_cursor = response.get("next_cursor")
         if not start_cursor:
             break
-    root_pages = []
-    for page in all_pages:
-        parent = page.get("parent", {})
-        parent_type = parent.get("type", "")
-        if parent_type != "database_id" and not (parent_type == "page_id" and parent.get("page_id") in [p['id'] for p in all_pages]):
-            root_pages.append(page)
-    return root_pages, all_pages
+
+async def search_all_pages(notion):
+    all_pages = []
+    async for pages in iter_search_pages(notion):
+        all_pages.extend(pages)
+    return all_pages
+
+def create_notion_client():
+    """요청 스케줄러가 붙은 Notion 클라이언트를 만듭니다.
+
+    NOTION_BASE_URL 환경 변수로 로컬 테스트 서버를 가리킬 수 있습니다.
+    """
+    options = {'auth': os.getenv("NOTION_API_KEY")}
+    if os.getenv("NOTION_BASE_URL"):
+        options['base_url'] = os.getenv("NOTION_BASE_URL")
+    return ScheduledAsyncClient(**options)
+
+async def load_workspace_index():
+    """워크스페이스 전체 페이지를 검색하여 WorkspaceIndex를 만듭니다."""
+    async for index, _, _ in get_root_pages():
+        pass
+    return index
+
+async def iter_changed_pages(notion, since):
+    """last_edited_time 내림차순 search로 since 이후(같은 시각 포함)에 바뀐 페이지만 묶음별로 내보냅니다.
+
+    Notion의 last_edited_time은 분 단위라 기준 시각과 같은 페이지도 다시 받습니다.
+    """
+    sort = {'direction': 'descending', 'timestamp': 'last_edited_time'}
+    async for pages in iter_search_pages(notion, sort):
+        changed = [page for page in pages if page.get('last_edited_time', '') >= since]
+        if changed:
+            yield changed
+        if len(changed) < len(pages):
+            break
+
+async def get_root_pages(snapshot_path=None):
+    """search 응답마다 (index, 새로 보일 루트 id 목록, 더 이상 루트가 아닌 id 목록)을 내보내는 비동기 제너레이터입니다.
+
+    첫 묶음은 search 한 번 만에 나옵니다. 부모가 나중에 도착한 페이지는 그때 '빠진 id'로 알려줍니다.
+    snapshot_path를 주면 저장된 인덱스를 API 호출 없이 먼저 내보내고, 그 뒤로는 스냅샷의 가장 최근
+    last_edited_time 이후에 바뀐 페이지만 받아 반영합니다(새로 보이는 루트에는 제목이 바뀐 루트도 포함).
+    스냅샷이 없거나 WORKSPACE_FULL_SYNC_INTERVAL보다 오래됐으면 전체 목록을 받습니다.
+    끝까지 순회하면 결과를 스냅샷으로 저장합니다.
+    """
+    notion = create_notion_client()
+    index, full_synced_at = load_snapshot(snapshot_path) if snapshot_path else (None, None)
+    if index is not None and time.time() - full_synced_at < WORKSPACE_FULL_SYNC_INTERVAL:
+        since = index.high_water_mark()
+        yield index, index.roots, []
+        async for pages in iter_changed_pages(notion, since):
+            added, removed = index.merge_pages(pages)
+            if added or removed:
+                yield index, added, removed
+    else:
+        index = WorkspaceIndex()
+        full_synced_at = time.time()
+        async for pages in iter_search_pages(notion):
+            added, removed = index.add_pages(pages)
+            yield index, added, removed
+    if snapshot_path:
+        save_snapshot(index, snapshot_path, full_synced_at)
 
 async def get_all_descendant_page_ids(page_id, all_pages):
-    ids = [page_id]
-    children = [p for p in all_pages if p.get("parent", {}).get("type") == "page_id" and p.get("parent", {}).get("page_id") == page_id]
-    for child in children:
-        ids.extend(await get_all_descendant_page_ids(child['id'], all_pages))
-    return ids
+    """all_pages에는 페이지 목록이나 이미 만들어둔 WorkspaceIndex를 넘길 수 있습니다."""
+    index = all_pages if isinstance(all_pages, WorkspaceIndex) else WorkspaceIndex(all_pages)
+    return index.descendant_ids(page_id)
+
+class SingleFlight:
+    """같은 키에 대한 동시 호출이 하나의 진행 중인 요청을 공유하도록 합니다.
+
+    성공한 결과는 객체가 살아있는 동안 기억하고, 실패한 호출은 잊어서 다음에 다시 시도합니다.
+    """
+
+    def __init__(self):
+        self._tasks = {}
 
-async def get_synced_block_original_and_top_parent(notion, block):
+    async def run(self, key, factory):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._forget_failed(key, t))
+        # 기다리던 쪽 하나가 취소되어도 공유 중인 요청은 계속 진행합니다.
+        return await asyncio.shield(task)
+
+    def _forget_failed(self, key, task):
+        if (task.cancelled() or task.exception() is not None) and self._tasks.get(key) is task:
+            del self._tasks[key]
+
+class BlockResolver:
+    """한 번의 내보내기 동안 동기화 블록 원본, 그 하위 블록, parent 체인 조회를 공유합니다.
+
+    같은 블록 id에 대한 동시 요청은 API를 한 번만 호출하며,
+    호출한 쪽이 결과를 수정해도 되도록 항상 복사본을 반환합니다.
+    """
+
+    def __init__(self, notion):
+        self.notion = notion
+        self._blocks = SingleFlight()
+        self._children = SingleFlight()
+        self._top_parents = SingleFlight()
+        self._pages = SingleFlight()
+
+    async def retrieve(self, block_id):
+        block = await self._blocks.run(block_id, lambda: self.notion.blocks.retrieve(block_id))
+        return copy.deepcopy(block)
+
+    async def list_children(self, block_id):
+        blocks = await self._children.run(block_id, lambda: list_child_blocks(self.notion, block_id))
+        return copy.deepcopy(blocks)
+
+    async def page(self, page_id):
+        page = await self._pages.run(page_id, lambda: self.notion.pages.retrieve(page_id=page_id))
+        return copy.deepcopy(page)
+
+    async def top_parent(self, block):
+        """(최상위 id, 'page' | 'database')를 반환합니다. 찾지 못하면 (None, None)."""
+        return await self._top_parents.run(block['id'], lambda: self._walk_up(block))
+
+    async def _walk_up(self, block):
+        parent = block.get('parent', {})
+        parent_type = parent.get('type')
+        if parent_type == 'block_id':
+            try:
+                parent_block = await self.retrieve(parent.get('block_id'))
+            except Exception:
+                return None, None
+            return await self.top_parent(parent_block)
+        if parent_type == 'page_id':
+            return parent.get('page_id'), 'page'
+        elif parent_type == 'database_id':
+            return parent.get('database_id'), 'database'
+        elif parent_type == 'workspace':
+            return block['id'], 'page'
+        else:
+            return None, None
+
+async def get_synced_block_original_and_top_parent(notion, block, resolver=None):
+    resolver = resolver or BlockResolver(notion)
     current_block = block
     if current_block.get('type') == 'synced_block':
         synced_from = current_block['synced_block'].get('synced_from')
         if synced_from and 'block_id' in synced_from:
             try:
-                original_block = await notion.blocks.retrieve(synced_from['block_id'])
-                return await get_synced_block_original_and_top_parent(notion, original_block)
+                original_block = await resolver.retrieve(synced_from['block_id'])
+                return await get_synced_block_original_and_top_parent(notion, original_block, resolver)
             except Exception as e:
+                # 권한이 없는 원본 등은 건너뛰고, 재시도로도 안 된 일시적 오류는 호출한 쪽에 알립니다.
+                if is_retryable(e):
+                    raise
                 print(f"[get_synced_block] 원본 블록 접근 실패: {e}")
                 return None, None, None
-    block_id_to_find_parent = current_block['id']
-    parent = current_block.get('parent', {})
-    parent_type = parent.get('type')
-    while parent_type == 'block_id':
-        next_id = parent.get('block_id')
-        try:
-            parent_block = await notion.blocks.retrieve(next_id)
-            parent = parent_block.get('parent', {})
-            parent_type = parent.get('type')
-            block_id_to_find_parent = parent_block['id']
-        except Exception:
-            return current_block, None, None
-    if parent_type == 'page_id':
-        return current_block, parent.get('page_id'), 'page'
-    elif parent_type == 'database_id':
-        return current_block, parent.get('database_id'), 'database'
-    elif parent_type == 'workspace':
-        return current_block, block_id_to_find_parent, 'page'
-    else:
-        return current_block, None, None
+    top_id, top_type = await resolver.top_parent(current_block)
+    return current_block, top_id, top_type
+
+async def synced_source_version(resolver, block, top_id=None, top_type=None):
+    """동기화 블록 원본 내용의 버전으로 쓸 last_edited_time을 반환합니다.
 
-async def fetch_all_child_blocks(notion, block_id):
+    원본 synced_block 자신의 last_edited_time은 그 안의 하위 블록이 바뀌어도 그대로이므로,
+    원본이 들어 있는 페이지의 last_edited_time을 씁니다. 페이지를 찾지 못하면 원본 블록의 값을 씁니다.
+    """
+    if top_id is None:
+        top_id, top_type = await resolver.top_parent(block)
+    if top_type == 'page' and top_id != block['id']:
+        return (await resolver.page(top_id)).get('last_edited_time')
+    return block.get('last_edited_time')
+
+async def list_child_blocks(notion, block_id):
+    """blocks.children.list를 끝까지 페이지네이션하여 직계 자식 블록만 반환합니다."""
     blocks = []
-    try:
-        response = await notion.blocks.children.list(block_id=block_id, page_size=100)
+    response = await notion.blocks.children.list(block_id=block_id, page_size=100)
+    blocks.extend(response['results'])
+    next_cursor = response.get('next_cursor')
+    while next_cursor:
+        response = await notion.blocks.children.list(block_id=block_id, page_size=100, start_cursor=next_cursor)
         blocks.extend(response['results'])
         next_cursor = response.get('next_cursor')
-        while next_cursor:
-            response = await notion.blocks.children.list(block_id=block_id, page_size=100, start_cursor=next_cursor)
-            blocks.extend(response['results'])
-            next_cursor = response.get('next_cursor')
-    except Exception as e:
-        print(f"블록 가져오기 오류: {e}")
-        return []
-    processed_blocks = []
-    for block in blocks:
-        if block.get('type') == 'synced_block':
-            orig_block, _, _ = await get_synced_block_original_and_top_parent(notion, block)
-            if orig_block:
-                if orig_block.get('has_children'):
-                    orig_block['children'] = await fetch_all_child_blocks(notion, orig_block['id'])
-                processed_blocks.append(orig_block)
-        elif block.get('has_children'):
-            block['children'] = await fetch_all_child_blocks(notion, block['id'])
-            processed_blocks.append(block)
-        else:
-            processed_blocks.append(block)
-    return processed_blocks
+    return blocks
+
+async def load_cached_tree(resolver, cache, block_id, last_edited_time):
+    """캐시된 블록 트리를 반환합니다.
+
+    트리에 포함된 동기화 블록 원본들의 버전(synced_source_version)도 다시 확인하여,
+    하나라도 바뀌었으면 미적중으로 처리합니다. 이미지 서명 URL이 만료된 경우도 미적중입니다.
+    """
+    entry, raw_size = cache.lookup(block_id, last_edited_time)
+    if entry is None or not cache.files_usable(entry.get('files', [])):
+        cache.miss()
+        return None
+    deps = entry['deps']
+
+    async def current_version(dep_id):
+        return await synced_source_version(resolver, await resolver.retrieve(dep_id))
+
+    try:
+        current = await asyncio.gather(*(current_version(dep_id) for dep_id in deps))
+    except Exception:
+        cache.miss()
+        return None
+    if any(version != deps[dep_id] for dep_id, version in zip(deps, current)):
+        cache.miss()
+        return None
+    cache.hit(raw_size)
+    return entry
+
+async def fetch_all_child_blocks(notion, block_id, concurrency=FETCH_CONCURRENCY, cache=None, last_edited_time=None, resolver=None):
+    """블록 트리를 레벨 단위(BFS)로 가져옵니다.
+
+    같은 레벨의 has_children 블록들은 concurrency 한도 안에서 동시에 요청하며,
+    결과는 기존과 같이 각 블록의 block['children']에 원래 순서대로 채워집니다.
+    cache가 주어지면 block_id(last_edited_time 기준)와 동기화 블록 원본 단위로
+    디스크 캐시를 사용합니다. 캐시 단위는 페이지(와 원본) 전체 트리이므로, 페이지에서 블록 하나만
+    바뀌어도 그 페이지 트리를 통째로 다시 가져옵니다. 블록의 last_edited_time은 그 아래 하위 블록이
+    바뀌어도 그대로라서, 하위 트리 단위로 캐시하려면 검증을 위해 결국 children을 다시 조회해야 하기 때문입니다. resolver를 여러 페이지가 공유하면 동기화 블록 원본과
+    그 하위 블록은 실행 동안 한 번만 가져옵니다.
+    """
+    resolver = resolver or BlockResolver(notion)
+    if cache is not None and last_edited_time:
+        entry = await load_cached_tree(resolver, cache, block_id, last_edited_time)
+        if entry is not None:
+            return entry['children']
+
+    semaphore = asyncio.Semaphore(concurrency)
+    # 트리에 들어간 동기화 블록 원본: id(원본 dict) -> 캐시 항목의 deps (직접 가져온 경우 None)
+    originals = {}
+    # id(원본 dict) -> synced_source_version. 원본 캐시 항목의 키와 의존성 검증에 씁니다.
+    versions = {}
+    # 동기화 블록 원본과 그 하위 블록들의 id(dict): 다른 페이지와 공유되므로 resolver를 통해 가져옵니다.
+    shared = set()
+    # 동기화 블록 원본에 접근하지 못해 빠진 하위 블록이 있는 블록의 id. 그 조상 트리는 캐시에 저장하지 않습니다.
+    incomplete = set()
+
+    async def resolve_synced(block):
+        async with semaphore:
+            with tracing.span('synced_resolve'):
+                orig_block, top_id, top_type = await get_synced_block_original_and_top_parent(notion, block, resolver)
+                if orig_block and cache is not None:
+                    versions[id(orig_block)] = await synced_source_version(resolver, orig_block, top_id, top_type)
+        if orig_block and cache is not None and orig_block.get('has_children'):
+            entry = await load_cached_tree(resolver, cache, orig_block['id'], versions[id(orig_block)])
+            if entry is not None:
+                orig_block['children'] = entry['children']
+                originals[id(orig_block)] = entry['deps']
+                return orig_block
+        if orig_block:
+            originals[id(orig_block)] = None
+        return orig_block
+
+    async def expand(parent, depth):
+        # 얕은 레벨의 요청이 깊은 레벨보다 먼저 나가도록 우선순위를 줍니다.
+        # 스케줄러가 재시도한 뒤에도 실패하면 예외를 그대로 던져, 내용이 빠진 페이지를 만들지 않습니다.
+        async with semaphore:
+            with request_priority(PRIORITY_CHILDREN + depth):
+                if id(parent) in shared:
+                    blocks = await resolver.list_children(parent['id'])
+                else:
+                    blocks = await list_child_blocks(notion, parent['id'])
+        synced = [b for b in blocks if b.get('type') == 'synced_block']
+        resolved = dict(zip((id(b) for b in synced), await asyncio.gather(*(resolve_synced(b) for b in synced))))
+        processed_blocks = []
+        for block in blocks:
+            if block.get('type') == 'synced_block':
+                orig_block = resolved[id(block)]
+                if orig_block:
+                    processed_blocks.append(orig_block)
+                else:
+                    incomplete.add(parent['id'])
+            else:
+                processed_blocks.append(block)
+        return processed_blocks
+
+    root = {'id': block_id}
+    level = [root]
+    depth = 0
+    while level:
+        results = await asyncio.gather(*(expand(block, depth) for block in level))
+        next_level = []
+        for block, children in zip(level, results):
+            block['children'] = children
+            for child in children:
+                if id(child) in originals or id(block) in shared:
+                    shared.add(id(child))
+            # 캐시에서 채워진 원본은 이미 children이 있으므로 더 내려가지 않습니다.
+            next_level.extend(child for child in children if child.get('has_children') and 'children' not in child)
+        level = next_level
+        depth += 1
+
+    if cache is not None:
+        def is_complete(blocks):
+            return all(block['id'] not in incomplete and is_complete(block.get('children', [])) for block in blocks)
+
+        def collect_deps(blocks, deps):
+            for block in blocks:
+                if id(block) in originals:
+                    deps[block['id']] = versions[id(block)]
+                    deps.update(originals[id(block)] or {})
+                collect_deps(block.get('children', []), deps)
+            return deps
+
+        def collect_files(blocks, files):
+            for block in blocks:
+                if block.get('type') == 'image' and 'file' in block.get('image', {}):
+                    file_data = block['image']['file']
+                    files.append((file_data.get('url'), file_data.get('expiry_time')))
+                collect_files(block.get('children', []), files)
+            return files
+
+        def store(tree_root, key_time):
+            if key_time and tree_root['id'] not in incomplete and is_complete(tree_root.get('children', [])):
+                children = tree_root.get('children', [])
+                cache.store(tree_root['id'], key_time, {'children': children, 'deps': collect_deps(children, {}), 'files': collect_files(children, [])})
+
+        def store_originals(blocks):
+            for block in blocks:
+                if id(block) in originals and originals[id(block)] is None and block.get('has_children'):
+                    store(block, versions[id(block)])
+                store_originals(block.get('children', []))
+
+        store_originals(root['children'])
+        store(root, last_edited_time)
+    return root['children']
 
 async def get_first_child_page_ids(page_id, notion_client):
     # Notion blocks.children.list로 실제 children 순서대로 추출
-    children = []
-    try:
-        response = await notion_client.blocks.children.list(block_id=page_id, page_size=100)
-        children = response['results']
-        next_cursor = response.get('next_cursor')
-        while next_cursor:
-            response = await notion_client.blocks.children.list(block_id=page_id, page_size=100, start_cursor=next_cursor)
-            children.extend(response['results'])
-            next_cursor = response.get('next_cursor')
-    except Exception as e:
-        print(f"하위 페이지 순서 가져오기 오류: {e}")
-        return []
-    
+    # 조회가 (스케줄러의 재시도 후에도) 실패하면 예외를 그대로 던집니다. 빈 목록을 돌려주면
+    # 호출한 쪽이 하위 페이지 대신 루트 페이지를 내보내, 잘못된 PDF가 오류 없이 만들어집니다.
+    children = await list_child_blocks(notion_client, page_id)
+
     # 빈 줄(empty paragraph)까지만 child_page를 가져오도록 수정
     child_page_ids = []
     for block in children:
@@ -111,4 +355,29 @@ async def get_first_child_page_ids(page_id, notion_client):
         if block['type'] == 'child_page':
             child_page_ids.append(block['id'])
             
-    return child_page_ids 
\ No newline at end of file
+    return child_page_ids
+
+async def collect_export_page_groups(root_ids, notion_client, on_root_expanded=None):
+    """선택한 루트들을 동시에 첫 번째 하위 페이지 목록으로 펼쳐 루트마다 (루트 id, 페이지 id 목록)을 반환합니다.
+
+    하위 페이지가 없으면 루트 자체를 씁니다. on_root_expanded(root_id, page_ids)는 루트 하나가
+    펼쳐질 때마다(완료 순서대로) 호출됩니다. 반환 값은 선택 순서를 유지합니다.
+    어느 루트든 하위 블록을 가져오지 못하면 그 예외를 던집니다.
+    """
+    async def expand(root_id):
+        child_ids = await get_first_child_page_ids(root_id, notion_client)
+        page_ids = child_ids or [root_id]
+        if on_root_expanded:
+            on_root_expanded(root_id, page_ids)
+        return root_id, page_ids
+
+    return await asyncio.gather(*(expand(root_id) for root_id in root_ids))
+
+async def collect_export_page_ids(root_ids, notion_client, on_root_expanded=None):
+    """선택한 루트들을 동시에 첫 번째 하위 페이지 목록으로 펼칩니다. 하위 페이지가 없으면 루트 자체를 씁니다.
+
+    on_root_expanded(root_id, page_ids)는 루트 하나가 펼쳐질 때마다(완료 순서대로) 호출됩니다.
+    반환 값은 선택 순서를 유지하고 중복을 제거한 페이지 id 목록입니다.
+    """
+    groups = await collect_export_page_groups(root_ids, notion_client, on_root_expanded)
+    return list(dict.fromkeys(page_id for _, page_ids in groups for page_id in page_ids))
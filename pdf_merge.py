@@ -0,0 +1,243 @@
+import gc
+import os
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+from config import PDF_MERGE_SEGMENT_PAGES
+from pdf_spool import open_pdf
+from utils import atomic_write
+import tracing
+
+# 이미 있는 PDF(PdfReader)의 [start, stop) 쪽 범위. 증분 내보내기에서 이전 출력을 그대로 옮길 때 씁니다.
+PageRange = namedtuple('PageRange', 'source start stop')
+
+# PDF 파일(path)에서 고른 쪽 번호(pages)만 이어 붙일 때 concatenate_pdfs에 넘기는 입력입니다.
+PdfPages = namedtuple('PdfPages', 'path pages')
+
+class OrderedPdfMerger:
+    """페이지 PDF를 완료되는 대로 받아 인덱스 순서대로 출력 문서에 이어 붙입니다.
+
+    순서보다 먼저 끝난 페이지는 앞 페이지가 올 때까지만 보관하고, 붙인 입력은 바로 내려놓습니다.
+    PyPDF2의 PdfWriter는 붙인 페이지를 write() 때까지 모두 들고 있으므로, 붙인 쪽이 segment_pages를
+    넘을 때마다 지금까지의 부분을 출력 옆의 조각 파일로 쓰고 새 PdfWriter로 이어 갑니다. 그래서 병합
+    메모리는 문서 전체가 아니라 조각 하나와 순서를 기다리는 페이지 정도로 유지됩니다.
+    write()는 조각이 하나면 이름만 바꾸고, 여럿이면 concatenate_pdfs로 조각을 하나씩 읽어 출력에
+    바로 이어 쓰므로 이때도 문서 전체를 메모리에 올리지 않습니다.
+    release가 주어지면 붙인 항목마다 호출합니다 (예: PdfSpool.release).
+    page_ranges는 인덱스마다 출력 문서에서 차지한 (시작 쪽, 쪽 수)입니다.
+    붙이지 못한 입력(깨진 PDF 등)은 건너뛰고 failed에 (인덱스: 예외)로 남깁니다.
+    """
+
+    def __init__(self, output_path, release=None, segment_pages=PDF_MERGE_SEGMENT_PAGES):
+        self.output_path = output_path
+        self.release = release
+        self.segment_pages = segment_pages
+        self._writer = None
+        self._pending = {}
+        self.next_index = 0
+        self.appended = 0
+        self.max_pending = 0
+        self.page_ranges = {}
+        self.failed = {}
+        # 조각 파일로 내보낸 쪽 수와 그 파일들
+        self.flushed_pages = 0
+        self.segment_count = 0
+        self.segments = []
+        self._segment_dir = None
+        # 병합 단계와 실패한 페이지 건너뛰기가 서로 다른 스레드에서 add를 부를 수 있습니다.
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, index, pdf):
+        """index번째 페이지 PDF(바이트, 경로 또는 PageRange, 건너뛸 페이지는 None)를 받고 순서가 된 페이지를 붙입니다."""
+        with self._lock:
+            self._add(index, pdf)
+
+    def _current_writer(self):
+        if self._writer is None:
+            # PyPDF2는 실제로 병합할 때만 불러옵니다.
+            from PyPDF2 import PdfWriter
+            self._writer = PdfWriter()
+        return self._writer
+
+    def _add(self, index, pdf):
+        self._pending[index] = pdf
+        self.max_pending = max(self.max_pending, len(self._pending))
+        while self.next_index in self._pending:
+            index = self.next_index
+            entry = self._pending.pop(index)
+            self.next_index += 1
+            if entry is None:
+                continue
+            writer = self._current_writer()
+            start = len(writer.pages)
+            try:
+                with tracing.span('merge'):
+                    if isinstance(entry, PageRange):
+                        writer.append(entry.source, pages=(entry.start, entry.stop))
+                    else:
+                        writer.append(open_pdf(entry))
+            except Exception as e:
+                print(f"PDF 병합 오류 ({index}번째 페이지): {e}")
+                self.failed[index] = e
+            else:
+                self.page_ranges[index] = (self.flushed_pages + start, len(writer.pages) - start)
+                self.appended += 1
+            if self.release and not isinstance(entry, PageRange):
+                self.release(entry)
+            if len(writer.pages) >= self.segment_pages:
+                self._flush()
+
+    def _flush(self):
+        """지금까지 붙인 쪽을 조각 파일로 쓰고 PdfWriter를 내려놓습니다."""
+        if self._writer is None or not len(self._writer.pages):
+            return
+        if self._segment_dir is None:
+            # 조각을 출력과 같은 디렉터리에 두어, 조각이 하나뿐이면 이름만 바꿔 끝낼 수 있게 합니다.
+            self._segment_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(self.output_path)}.", suffix='.segments',
+                                                 dir=os.path.dirname(self.output_path) or '.')
+        path = os.path.join(self._segment_dir, f"{len(self.segments):05d}.pdf")
+        with tracing.span('merge_flush'):
+            with open(path, 'wb') as f:
+                self._writer.write(f)
+        self.flushed_pages += len(self._writer.pages)
+        self.segments.append(path)
+        self.segment_count += 1
+        self._writer = None
+        # PyPDF2 객체의 참조 순환 때문에 바로 수거하지 않으면 내려놓은 조각이 메모리에 남습니다.
+        gc.collect()
+
+    def write(self):
+        """붙인 페이지를 출력 파일로 씁니다. 붙인 페이지가 없으면 None을 반환합니다."""
+        if self._pending:
+            raise RuntimeError(f"병합 순서를 기다리는 페이지가 남아 있습니다: {sorted(self._pending)}")
+        if not self.appended:
+            return None
+        try:
+            self._flush()
+            with tracing.span('merge_write'):
+                if len(self.segments) == 1:
+                    os.replace(self.segments[0], self.output_path)
+                else:
+                    concatenate_pdfs(self.segments, self.output_path)
+                if tracing.enabled():
+                    tracing.add('bytes', os.path.getsize(self.output_path))
+        finally:
+            self.close()
+        return self.output_path
+
+    def close(self):
+        """조각 파일과 아직 쓰지 않은 페이지를 버립니다."""
+        self._writer = None
+        if self._segment_dir is not None:
+            shutil.rmtree(self._segment_dir, ignore_errors=True)
+            self._segment_dir = None
+        self.segments = []
+
+def concatenate_pdfs(paths, output_path):
+    """PDF 파일들을 순서대로 이어 output_path에 씁니다. 항목이 PdfPages면 그 파일의 고른 쪽만 옮깁니다.
+
+    입력을 한 번에 하나씩 읽어 그 페이지에서 닿는 객체만 번호를 새로 매겨 바로 출력 파일에 쓰고,
+    페이지 트리와 xref는 마지막에 씁니다. 그래서 메모리는 입력 하나 크기만큼만 씁니다.
+    입력의 문서 수준 정보(개요, 이름 트리 등)는 옮기지 않습니다. 출력은 atomic_write로 씁니다.
+    """
+    from PyPDF2 import PdfReader
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject, NumberObject, StreamObject
+
+    # 1번은 페이지 트리 루트, 2번은 카탈로그로 남겨 둡니다. offsets[번호] = 출력 파일 안의 위치
+    offsets = [None, None, None]
+    pages_ref = IndirectObject(1, 0, None)
+    kids = ArrayObject()
+
+    with atomic_write(output_path) as out:
+        def write_object(number, obj):
+            offsets[number] = out.tell()
+            out.write(f"{number} 0 obj\n".encode('ascii'))
+            obj.write_to_stream(out, None)
+            out.write(b"\nendobj\n")
+
+        def copy_pages(source):
+            """입력 하나의 페이지와 그 페이지에서 닿는 객체를 출력에 쓰고, 새 페이지 참조를 kids에 더합니다."""
+            if isinstance(source, PdfPages):
+                reader, keep = PdfReader(source.path), set(source.pages)
+            else:
+                reader, keep = PdfReader(source), None
+            numbers = {}
+            queue = []
+            # 옮기지 않는 쪽. 링크 등이 가리키면 null로 바꿔 그 쪽이 딸려 오지 않게 합니다.
+            dropped = set()
+
+            def ref(obj):
+                key = (obj.idnum, obj.generation)
+                if key not in numbers:
+                    numbers[key] = len(offsets)
+                    offsets.append(None)
+                    queue.append(obj)
+                return IndirectObject(numbers[key], 0, None)
+
+            def convert(obj):
+                if isinstance(obj, IndirectObject):
+                    if (obj.idnum, obj.generation) in dropped:
+                        return NullObject()
+                    target = obj.get_object()
+                    # 원래 문서의 페이지 트리를 가리키는 참조는 새 페이지 트리로 바꿔, 다른 페이지까지 끌려오지 않게 합니다.
+                    if isinstance(target, DictionaryObject) and target.get('/Type') == '/Pages':
+                        return pages_ref
+                    return ref(obj)
+                if isinstance(obj, StreamObject):
+                    copied = obj.__class__()
+                    copied._data = obj._data
+                    copied.update({key: convert(value) for key, value in obj.items()})
+                    return copied
+                if isinstance(obj, DictionaryObject):
+                    return DictionaryObject({key: convert(value) for key, value in obj.items()})
+                if isinstance(obj, ArrayObject):
+                    return ArrayObject(convert(value) for value in obj)
+                return obj
+
+            # 페이지는 reader.pages의 값(상속된 Resources, MediaBox 등을 채운 것)으로 씁니다.
+            page_objects = {}
+            for number, page in enumerate(reader.pages):
+                reference = page.indirect_reference
+                if keep is not None and number not in keep:
+                    dropped.add((reference.idnum, reference.generation))
+                    continue
+                page_objects[(reference.idnum, reference.generation)] = page
+                kids.append(ref(reference))
+            while queue:
+                reference = queue.pop()
+                key = (reference.idnum, reference.generation)
+                obj = page_objects.get(key)
+                if obj is not None:
+                    page = DictionaryObject({name: convert(value) for name, value in obj.items() if name != '/Parent'})
+                    page[NameObject('/Parent')] = pages_ref
+                    write_object(numbers[key], page)
+                else:
+                    write_object(numbers[key], convert(reference.get_object()))
+
+        out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        for source in paths:
+            copy_pages(source)
+            # PyPDF2 객체는 서로 참조하는 순환이 있어, 바로 수거해야 다음 입력을 읽기 전에 메모리가 비워집니다.
+            gc.collect()
+
+        write_object(1, DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): kids,
+            NameObject('/Count'): NumberObject(len(kids)),
+        }))
+        write_object(2, DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): pages_ref,
+        }))
+        xref_offset = out.tell()
+        out.write(f"xref\n0 {len(offsets)}\n0000000000 65535 f \n".encode('ascii'))
+        for offset in offsets[1:]:
+            out.write(f"{offset:010d} 00000 n \n".encode('ascii'))
+        out.write(f"trailer\n<< /Size {len(offsets)} /Root 2 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
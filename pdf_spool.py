@@ -0,0 +1,79 @@
+import os
+import io
+import shutil
+import tempfile
+import threading
+from config import TEMP_DIR, PDF_SPOOL_MAX_MEMORY_BYTES
+
+class PdfSpool:
+    """렌더링된 페이지 PDF를 병합 전까지 보관합니다.
+
+    아직 병합되지 않은 페이지의 합계가 max_memory_bytes 이하인 동안은 바이트 그대로 메모리에 두고,
+    넘으면 그 뒤 페이지는 실행마다 새로 만드는 임시 디렉터리(temp_root 아래)에 씁니다. 그래서 동시에
+    여러 번 내보내도 임시 파일 이름이 겹치지 않고, 한도 안의 내보내기는 병합을 위해 임시 파일을 거치지 않습니다.
+    (렌더 캐시(.etc/cache/pdf)와 출력 옆의 매니페스트는 이와 별개로 디스크에 씁니다.)
+    병합된 항목은 release()로 내려놓아 한도를 다시 비웁니다.
+    """
+
+    def __init__(self, temp_root=TEMP_DIR, max_memory_bytes=PDF_SPOOL_MAX_MEMORY_BYTES):
+        self.temp_root = temp_root
+        self.max_memory_bytes = max_memory_bytes
+        self.memory_bytes = 0
+        self.peak_memory_bytes = 0
+        self.spilled = 0
+        self.run_dir = None
+        # 병합은 작업 스레드에서 release를 부르므로 메모리 합계는 잠금 안에서 고칩니다.
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run_dir(self):
+        if self.run_dir is None:
+            os.makedirs(self.temp_root, exist_ok=True)
+            self.run_dir = tempfile.mkdtemp(prefix='run-', dir=self.temp_root)
+        return self.run_dir
+
+    def add(self, data, name):
+        """PDF 바이트를 보관하고 merge_pdfs에 넘길 항목(바이트 또는 파일 경로)을 반환합니다."""
+        with self._lock:
+            if self.memory_bytes + len(data) <= self.max_memory_bytes:
+                self.memory_bytes += len(data)
+                self.peak_memory_bytes = max(self.peak_memory_bytes, self.memory_bytes)
+                return data
+        path = os.path.join(self._run_dir(), f"{name}.pdf")
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.spilled += 1
+        return path
+
+    def release(self, entry):
+        """병합이 끝난 항목을 내려놓아 그만큼 메모리 한도를 비우고, 이 보관소가 만든 임시 파일이면 지웁니다."""
+        if isinstance(entry, (bytes, bytearray)):
+            with self._lock:
+                self.memory_bytes -= len(entry)
+            return
+        if self.run_dir is None or os.path.dirname(entry) != self.run_dir:
+            return
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    def close(self):
+        if self.run_dir is not None:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
+            self.run_dir = None
+
+    def summary(self):
+        return (f"PDF 보관: 최대 메모리 {self.peak_memory_bytes / 1024:.1f}KB, "
+                f"임시 파일로 내보낸 페이지 {self.spilled}개")
+
+def open_pdf(entry):
+    """PdfSpool 항목(바이트 또는 파일 경로)을 PyPDF2가 읽을 수 있는 형태로 바꿉니다."""
+    if isinstance(entry, (bytes, bytearray)):
+        return io.BytesIO(entry)
+    return entry
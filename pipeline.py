@@ -0,0 +1,97 @@
+import asyncio
+from config import EXPORT_QUEUE_SIZE, EXPORT_PAGE_RETRY_BACKOFF
+
+# 앞 단계의 워커가 모두 끝났음을 다음 단계 워커에게 알리는 표시입니다.
+_DONE = object()
+
+class StagedPipeline:
+    """항목을 여러 단계에 차례로 흘려보내는 파이프라인입니다.
+
+    stages는 (이름, 워커 수, 함수) 목록이며, 함수는 (이전 단계 결과, 인덱스)를 받는 코루틴입니다.
+    단계 사이 큐는 queue_size로 크기가 제한돼 뒤 단계가 밀리면 앞 단계도 기다립니다.
+    그래서 N+k번째 페이지를 가져오는 동안 N번째 페이지를 렌더링하면서도 메모리는 일정하게 유지됩니다.
+    progress_callback은 한 항목이 어떤 단계를 마칠 때마다 (단계 이름, 완료 수, 전체 수)를 받습니다.
+    단계 함수가 예외를 내면 retries번까지 (retry_backoff초부터 두 배씩 기다리며) 다시 시도합니다.
+    failure_callback이 주어지면 그래도 실패한 항목만 나머지 단계를 건너뛰고 failures에 기록되며,
+    failure_callback(인덱스, 단계 이름, 예외)을 기다린 뒤 다른 항목은 계속 처리합니다.
+    """
+
+    def __init__(self, stages, queue_size=EXPORT_QUEUE_SIZE, progress_callback=None, retries=0, retry_backoff=EXPORT_PAGE_RETRY_BACKOFF, failure_callback=None):
+        self.stages = [(name, max(1, workers), func) for name, workers, func in stages]
+        self.queue_size = queue_size
+        self.progress_callback = progress_callback
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.failure_callback = failure_callback
+        self.completed = {name: 0 for name, _, _ in self.stages}
+        self.failures = {}
+
+    async def _call(self, func, item, idx):
+        for attempt in range(self.retries + 1):
+            try:
+                return await func(item, idx)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def run(self, items):
+        """모든 항목을 마지막 단계까지 처리하고 결과를 입력 순서대로 반환합니다.
+
+        failure_callback이 없을 때 한 단계라도 예외가 나면 나머지 작업을 모두 취소하고 그 예외를 다시 던집니다.
+        실패로 건너뛴 항목의 결과는 None입니다.
+        """
+        items = list(items)
+        total = len(items)
+        results = [None] * total
+        inboxes = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+
+        async def feed():
+            for idx, item in enumerate(items):
+                await inboxes[0].put((idx, item))
+            for _ in range(self.stages[0][1]):
+                await inboxes[0].put(_DONE)
+
+        # 단계마다 아직 돌고 있는 워커 수. 마지막 워커가 끝나면 다음 단계에 종료 표시를 보냅니다.
+        running = [workers for _, workers, _ in self.stages]
+
+        async def work(stage_index):
+            name, _, func = self.stages[stage_index]
+            inbox = inboxes[stage_index]
+            outbox = inboxes[stage_index + 1] if stage_index + 1 < len(inboxes) else None
+            while True:
+                entry = await inbox.get()
+                if entry is _DONE:
+                    break
+                idx, item = entry
+                try:
+                    result = await self._call(func, item, idx)
+                except Exception as e:
+                    if self.failure_callback is None:
+                        raise
+                    self.failures[idx] = (name, e)
+                    await self.failure_callback(idx, name, e)
+                    continue
+                if outbox is not None:
+                    await outbox.put((idx, result))
+                else:
+                    results[idx] = result
+                self.completed[name] += 1
+                if self.progress_callback:
+                    self.progress_callback(name, self.completed[name], total)
+            running[stage_index] -= 1
+            if outbox is not None and running[stage_index] == 0:
+                for _ in range(self.stages[stage_index + 1][1]):
+                    await outbox.put(_DONE)
+
+        tasks = [asyncio.create_task(feed())]
+        for stage_index, (_, workers, _) in enumerate(self.stages):
+            tasks.extend(asyncio.create_task(work(stage_index)) for _ in range(workers))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return results
@@ -0,0 +1,101 @@
+import os
+import re
+import json
+import hashlib
+from config import RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES
+from utils import atomic_write
+
+# 한도를 넘으면 이 비율까지 지워, 가득 찬 캐시에서 저장할 때마다 디렉터리를 훑지 않게 합니다.
+EVICT_TARGET_RATIO = 0.9
+
+# Notion 파일 URL의 서명 쿼리는 조회할 때마다 바뀌므로 해시에서 제외합니다.
+SIGNED_URL_QUERY = re.compile(r"(https://[^'\"\s?]*amazonaws\.com/[^'\"\s?]*)\?[^'\"\s]*")
+
+class RenderCache:
+    """최종 HTML과 렌더링 옵션의 해시로 PDF를 재사용하는 디렉터리 캐시입니다.
+
+    파일 수정 시각을 마지막 사용 시각으로 쓰며, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 PDF부터 지웁니다. 전체 크기는 처음 저장할 때 한 번 세어 두고
+    저장할 때마다 더해 가므로, 디렉터리는 한도를 넘었을 때만 다시 훑습니다.
+    """
+
+    def __init__(self, cache_dir=RENDER_CACHE_DIR, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_reused = 0
+        self._total_bytes = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(full_html, options):
+        html = SIGNED_URL_QUERY.sub(r'\1', full_html)
+        digest = hashlib.sha256(html.encode('utf-8'))
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def fetch(self, key):
+        """캐시에 있으면 PDF 바이트를, 없으면 None을 반환합니다."""
+        cached = self._path(key)
+        try:
+            with open(cached, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(cached)
+        self.hits += 1
+        self.bytes_reused += len(data)
+        return data
+
+    def store(self, key, data):
+        try:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            with atomic_write(self._path(key)) as f:
+                f.write(data)
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        except OSError as e:
+            print(f"렌더 캐시 저장 오류: {e}")
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            # 다른 실행이 아직 쓰고 있는 임시 파일은 건드리지 않습니다.
+            if not name.endswith('.pdf'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            self._total_bytes = total
+            return
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * EVICT_TARGET_RATIO:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total_bytes = total
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return (f"렌더 캐시: 적중 {self.hits} / 미적중 {self.misses} ({rate:.1f}%), "
+                f"재사용한 PDF {self.bytes_reused / 1024:.1f}KB")
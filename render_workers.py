@@ -0,0 +1,69 @@
+import os
+import asyncio
+import multiprocessing
+from multiprocessing.util import Finalize
+from concurrent.futures import ProcessPoolExecutor
+from browser_pool import BrowserPool
+from asset_cache import AssetCache
+
+# 워커 프로세스 안에서만 쓰는 이벤트 루프와 브라우저
+_worker = {}
+
+def _init_worker(use_asset_cache):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    asset_cache = AssetCache() if use_asset_cache else None
+    pool = loop.run_until_complete(BrowserPool(size=1, asset_cache=asset_cache).start())
+    _worker.update(loop=loop, pool=pool)
+    # 워커 프로세스가 종료될 때 브라우저를 닫습니다.
+    Finalize(None, _close_worker, exitpriority=10)
+
+def _close_worker():
+    pool = _worker.pop('pool', None)
+    loop = _worker.pop('loop', None)
+    if pool is not None:
+        try:
+            loop.run_until_complete(pool.close())
+        except Exception:
+            pass
+    if loop is not None:
+        loop.close()
+
+def _render_in_worker(full_html):
+    return _worker['loop'].run_until_complete(_worker['pool'].render(full_html))
+
+class ProcessRenderPool:
+    """HTML -> PDF 렌더링을 여러 프로세스에 나눠 맡기는 풀입니다.
+
+    워커 프로세스마다 Chromium을 하나씩 띄워두며, BrowserPool과 같은
+    render(full_html) -> PDF 바이트 인터페이스를 제공합니다.
+    """
+
+    def __init__(self, workers=None, use_asset_cache=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_asset_cache = use_asset_cache
+        self._executor = None
+
+    async def start(self):
+        # 이벤트 루프가 돌고 있는 프로세스를 fork하지 않도록 spawn을 사용합니다.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.use_asset_cache,),
+        )
+        return self
+
+    async def close(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def render(self, full_html):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _render_in_worker, full_html)
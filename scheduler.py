@@ -0,0 +1,144 @@
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import contextvars
+from contextlib import contextmanager
+from dataclasses import fields
+from notion_client import AsyncClient
+from notion_client.client import ClientOptions
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+from config import NOTION_RATE_LIMIT, NOTION_RATE_BURST, NOTION_MAX_RETRIES, NOTION_BACKOFF_BASE, NOTION_BACKOFF_MAX
+import tracing
+
+# 숫자가 작을수록 먼저 보냅니다. 페이지 메타데이터/검색이 깊은 하위 블록보다 우선합니다.
+PRIORITY_METADATA = 0
+PRIORITY_CHILDREN = 1
+
+_request_priority = contextvars.ContextVar('request_priority', default=None)
+
+@contextmanager
+def request_priority(priority):
+    """이 블록 안에서 보내는 요청의 우선순위를 지정합니다."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+def default_priority(path):
+    if path.startswith('blocks/') and path.rstrip('/').endswith('/children'):
+        return PRIORITY_CHILDREN
+    return PRIORITY_METADATA
+
+class RequestScheduler:
+    """우선순위 대기열이 있는 토큰 버킷입니다.
+
+    평균 rate회/초, 최대 burst회까지 몰아서 보낼 수 있고,
+    429의 Retry-After를 받으면 그 시간 동안 모든 요청을 멈춥니다.
+    """
+
+    def __init__(self, rate=NOTION_RATE_LIMIT, burst=NOTION_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._timer = None
+
+    async def acquire(self, priority=PRIORITY_METADATA):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._dispatch()
+        await future
+
+    def pause(self, seconds):
+        """Retry-After 등으로 모든 요청을 seconds 동안 멈춥니다."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self):
+        self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._paused_until:
+            self._schedule(self._paused_until - now)
+            return
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        if self._waiters:
+            self._schedule((1 - self._tokens) / self.rate)
+
+    def _schedule(self, delay):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(max(delay, 0), self._dispatch)
+
+def retry_delay(error, attempt):
+    """429면 Retry-After를, 아니면 지터를 더한 지수 백오프 시간을 반환합니다."""
+    if isinstance(error, HTTPResponseError) and error.status == 429:
+        retry_after = error.headers.get('retry-after') if error.headers else None
+        try:
+            return min(float(retry_after), NOTION_BACKOFF_MAX)
+        except (TypeError, ValueError):
+            pass
+    base = min(NOTION_BACKOFF_BASE * (2 ** attempt), NOTION_BACKOFF_MAX)
+    return random.uniform(base / 2, base)
+
+def is_retryable(error):
+    if isinstance(error, RequestTimeoutError):
+        return True
+    return isinstance(error, HTTPResponseError) and (error.status == 429 or error.status >= 500)
+
+class ScheduledAsyncClient(AsyncClient):
+    """모든 요청을 RequestScheduler를 거쳐 보내고 429/5xx를 재시도하는 AsyncClient입니다."""
+
+    def __init__(self, *args, scheduler=None, max_retries=NOTION_MAX_RETRIES, **kwargs):
+        # notion-client 자체 재시도가 있는 버전에서는 끄고 여기서 일괄 처리합니다.
+        if 'retry' in {f.name for f in fields(ClientOptions)}:
+            kwargs.setdefault('retry', False)
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler or RequestScheduler()
+        self.max_retries = max_retries
+        self.request_count = 0
+        self.retry_count = 0
+        self.rate_limited_count = 0
+
+    async def request(self, path, method, *args, **kwargs):
+        priority = _request_priority.get()
+        if priority is None:
+            priority = default_priority(path)
+        attempt = 0
+        while True:
+            if tracing.enabled():
+                wait_start = time.perf_counter()
+                await self.scheduler.acquire(priority)
+                tracing.add('throttle_s', time.perf_counter() - wait_start)
+            else:
+                await self.scheduler.acquire(priority)
+            self.request_count += 1
+            tracing.add('api_calls')
+            try:
+                return await super().request(path, method, *args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(e, attempt)
+                if isinstance(e, HTTPResponseError) and e.status == 429:
+                    self.rate_limited_count += 1
+                    tracing.add('rate_limited')
+                    self.scheduler.pause(delay)
+                self.retry_count += 1
+                tracing.add('retries')
+                attempt += 1
+                await asyncio.sleep(delay)
@@ -0,0 +1,99 @@
+import json
+import time
+import contextvars
+from contextlib import contextmanager, nullcontext
+
+# 추적이 꺼져 있으면 span()은 이 객체를 그대로 돌려주므로 비용이 거의 없습니다.
+_NULL_SPAN = nullcontext()
+_tracer = contextvars.ContextVar('tracer', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    __slots__ = ('stage', 'page_id', 'start', 'end', 'counters')
+
+    def __init__(self, stage, page_id, start):
+        self.stage = stage
+        self.page_id = page_id
+        self.start = start
+        self.end = start
+        self.counters = {}
+
+class Tracer:
+    """내보내기 단계별 구간(span)과 API 호출 수, 재시도, 바이트 수를 기록합니다."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+
+    @contextmanager
+    def span(self, stage, page_id=None):
+        parent = _current_span.get()
+        if page_id is None and parent is not None:
+            page_id = parent.page_id
+        span = Span(stage, page_id, time.perf_counter())
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+            self.spans.append(span)
+
+    def write_chrome_trace(self, path):
+        """chrome://tracing 이나 Perfetto에서 열 수 있는 JSON을 씁니다. 페이지마다 한 줄(tid)입니다."""
+        lanes = {}
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            tid = lanes.setdefault(span.page_id, len(lanes))
+            events.append({
+                'name': span.stage, 'ph': 'X', 'pid': 1, 'tid': tid,
+                'ts': (span.start - self.origin) * 1e6, 'dur': (span.end - span.start) * 1e6,
+                'args': {'page_id': span.page_id, **span.counters},
+            })
+        events.extend({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': str(page_id or 'export')}}
+                      for page_id, tid in lanes.items())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def summary(self):
+        stages = {}
+        for span in self.spans:
+            stat = stages.setdefault(span.stage, {'count': 0, 'total': 0.0, 'max': 0.0, 'counters': {}})
+            duration = span.end - span.start
+            stat['count'] += 1
+            stat['total'] += duration
+            stat['max'] = max(stat['max'], duration)
+            for name, value in span.counters.items():
+                stat['counters'][name] = stat['counters'].get(name, 0) + value
+        lines = [f"{'단계':<16}{'횟수':>6}{'합계(s)':>10}{'평균(ms)':>10}{'최대(ms)':>10}  카운터"]
+        for stage, stat in sorted(stages.items(), key=lambda item: -item[1]['total']):
+            counters = ', '.join(f"{name}={value:g}" for name, value in sorted(stat['counters'].items()))
+            lines.append(f"{stage:<16}{stat['count']:>6}{stat['total']:>10.2f}"
+                         f"{stat['total'] / stat['count'] * 1000:>10.1f}{stat['max'] * 1000:>10.1f}  {counters}")
+        return '\n'.join(lines)
+
+def start_tracing():
+    """현재 컨텍스트(와 이후 만들어지는 태스크)에서 추적을 켜고 Tracer를 반환합니다."""
+    tracer = Tracer()
+    _tracer.set(tracer)
+    return tracer
+
+def stop_tracing():
+    _tracer.set(None)
+
+def enabled():
+    return _tracer.get() is not None
+
+def span(stage, page_id=None):
+    tracer = _tracer.get()
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(stage, page_id)
+
+def add(counter, value=1):
+    """현재 span의 카운터를 올립니다. 추적이 꺼져 있으면 아무것도 하지 않습니다."""
+    if _tracer.get() is None:
+        return
+    current = _current_span.get()
+    if current is not None:
+        current.counters[counter] = current.counters.get(counter, 0) + value
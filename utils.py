@@ -1,3 +1,7 @@
+import os
+import uuid
+from contextlib import contextmanager
+
 def extract_page_title(page_info):
     """Notion 페이지 정보에서 제목을 추출합니다."""
     try:
@@ -10,4 +14,23 @@ def extract_page_title(page_info):
         return "Untitled"
     except Exception as e:
         print(f"제목 추출 중 오류: {e}")
-        return "Untitled" 
\ No newline at end of file
+        return "Untitled"
+
+@contextmanager
+def atomic_write(path, mode='wb', encoding=None):
+    """path 옆의 임시 파일을 열어 주고, with 블록이 끝나면 그 파일을 path로 바꿉니다.
+
+    다 쓴 뒤에 이름을 바꾸므로 path에는 쓰다 만 파일이 보이지 않고, 임시 파일 이름은 호출마다 달라
+    같은 path를 동시에 써도 서로 덮지 않습니다. 블록에서 예외가 나면 임시 파일을 지우고 다시 던집니다.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:12]}.tmp"
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
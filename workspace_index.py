@@ -0,0 +1,158 @@
+import os
+import json
+import time
+from utils import extract_page_title, atomic_write
+
+SNAPSHOT_VERSION = 1
+
+class WorkspaceIndex:
+    """search 결과로 한 번 만들어두는 페이지 그래프 인덱스입니다.
+
+    id -> 페이지, 부모 페이지 id -> 자식 페이지 id 목록, 루트 페이지 목록을 선형 시간에 만들고,
+    이후 조회는 모두 O(1)입니다. 자식 순서는 search 결과 순서를 따릅니다.
+    """
+
+    def __init__(self, pages=()):
+        self._reset()
+        self.add_pages(pages)
+
+    def _reset(self):
+        self.pages = {}
+        self.children = {}
+        self._roots = {}
+        self._order = {}
+        # 부모 페이지가 아직 도착하지 않은 페이지들 (부모 id -> 자식 id 목록), 그동안은 임시로 루트에 둡니다.
+        self._orphans = {}
+        self._titles = {}
+
+    @property
+    def roots(self):
+        return list(self._roots)
+
+    def add_pages(self, pages):
+        """search 응답 한 묶음을 반영하고 (새로 루트가 된 id 목록, 루트에서 빠진 id 목록)을 반환합니다.
+
+        부모보다 먼저 도착한 페이지는 임시 루트로 두었다가 부모가 도착하면 그 자식으로 옮깁니다.
+        모든 묶음을 반영한 뒤의 결과는 전체 목록으로 한 번에 만든 인덱스와 같습니다.
+        """
+        added = []
+        removed = []
+        for page in pages:
+            page_id = page['id']
+            if page_id in self.pages:
+                self.pages[page_id] = page
+                self._titles.pop(page_id, None)
+                continue
+            self.pages[page_id] = page
+            self._order[page_id] = len(self._order)
+            parent = page.get('parent', {})
+            parent_type = parent.get('type', '')
+            if parent_type == 'page_id' and parent.get('page_id') in self.pages:
+                self.children.setdefault(parent['page_id'], []).append(page_id)
+            elif parent_type != 'database_id':
+                self._roots[page_id] = None
+                added.append(page_id)
+                if parent_type == 'page_id':
+                    self._orphans.setdefault(parent['page_id'], []).append(page_id)
+            adopted = self._orphans.pop(page_id, None)
+            if adopted:
+                for child_id in adopted:
+                    del self._roots[child_id]
+                    removed.append(child_id)
+                children = self.children.setdefault(page_id, [])
+                children.extend(adopted)
+                children.sort(key=self._order.__getitem__)
+        # 같은 묶음 안에서 추가됐다가 바로 빠진 페이지는 어느 쪽에도 알리지 않습니다.
+        added_set = set(added)
+        return [page_id for page_id in added if page_id in self._roots], [page_id for page_id in removed if page_id not in added_set]
+
+    def merge_pages(self, pages):
+        """변경분(search 결과)을 반영하고 (새로 보이거나 제목 등이 바뀐 루트 id 목록, 루트에서 빠진 id 목록)을 반환합니다.
+
+        보관됨/휴지통 상태로 온 페이지는 지우고, 부모가 바뀐(이동한) 페이지는 새 위치로 옮깁니다.
+        이미 있는 페이지가 바뀌면 메모리 안에서 인덱스를 다시 만들고, 새 페이지만 있으면 add_pages로 덧붙입니다.
+        """
+        updated = {}
+        deleted = set()
+        for page in pages:
+            page_id = page['id']
+            if page.get('archived') or page.get('in_trash'):
+                if page_id in self.pages:
+                    deleted.add(page_id)
+                continue
+            known = self.pages.get(page_id)
+            if known is not None and known.get('last_edited_time') == page.get('last_edited_time') and known.get('parent') == page.get('parent'):
+                continue
+            updated[page_id] = page
+        if not deleted and not any(page_id in self.pages for page_id in updated):
+            return self.add_pages(updated.values())
+
+        old_roots = self._roots
+        merged = {page_id: updated.get(page_id, page) for page_id, page in self.pages.items() if page_id not in deleted}
+        for page_id, page in updated.items():
+            merged.setdefault(page_id, page)
+        self._reset()
+        self.add_pages(merged.values())
+        changed = [page_id for page_id in self._roots if page_id not in old_roots or page_id in updated]
+        return changed, [page_id for page_id in old_roots if page_id not in self._roots]
+
+    def high_water_mark(self):
+        """가장 최근 last_edited_time (변경분 동기화의 기준점)입니다."""
+        return max((page.get('last_edited_time', '') for page in self.pages.values()), default='')
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, page_id):
+        return page_id in self.pages
+
+    def get(self, page_id):
+        return self.pages.get(page_id)
+
+    def all_pages(self):
+        return list(self.pages.values())
+
+    def root_pages(self):
+        return [self.pages[page_id] for page_id in self.roots]
+
+    def child_ids(self, page_id):
+        return self.children.get(page_id, [])
+
+    def title(self, page_id):
+        if page_id not in self._titles:
+            self._titles[page_id] = extract_page_title(self.pages[page_id])
+        return self._titles[page_id]
+
+    def descendant_ids(self, page_id):
+        """page_id 자신과 모든 하위 페이지 id를 전위 순회 순서로 반환합니다."""
+        ids = []
+        stack = [page_id]
+        while stack:
+            current = stack.pop()
+            ids.append(current)
+            stack.extend(reversed(self.children.get(current, [])))
+        return ids
+
+def save_snapshot(index, path, full_synced_at):
+    """인덱스를 디스크에 저장합니다. full_synced_at은 마지막 전체 동기화 시각(time.time())입니다."""
+    data = {'version': SNAPSHOT_VERSION, 'full_synced_at': full_synced_at, 'saved_at': time.time(), 'pages': index.all_pages()}
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with atomic_write(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    except Exception as e:
+        print(f"워크스페이스 스냅샷 저장 오류: {e}")
+
+def load_snapshot(path):
+    """저장된 (인덱스, 마지막 전체 동기화 시각)을 읽습니다. 없거나 읽을 수 없으면 (None, None)입니다."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None, None
+    except Exception as e:
+        print(f"워크스페이스 스냅샷 읽기 오류: {e}")
+        return None, None
+    if data.get('version') != SNAPSHOT_VERSION:
+        return None, None
+    return WorkspaceIndex(data['pages']), data.get('full_synced_at', 0)